@@ -0,0 +1,59 @@
+import { bench, describe } from "vitest";
+import { generateApiKey, hashApiKey } from "../auth/crypto";
+import { createDatabase } from "../db/client";
+import { apiKeys } from "../db/schema";
+import { ApiKeyCache, loadApiKey } from "../middleware/api-key-cache";
+
+// Run with `pnpm --filter @cerberus/api bench`
+const db = createDatabase({ url: "file::memory:" });
+await db.run(`
+	CREATE TABLE api_keys (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		name TEXT NOT NULL,
+		key_hash TEXT NOT NULL UNIQUE,
+		key_prefix TEXT NOT NULL,
+		created_at TEXT NOT NULL,
+		revoked_at TEXT,
+		last_used_at TEXT
+	)
+`);
+
+const keys = Array.from({ length: 100 }, () => generateApiKey());
+await db.insert(apiKeys).values(
+	await Promise.all(
+		keys.map(async (key, i) => ({
+			userId: i,
+			name: `bench-${i}`,
+			keyHash: await hashApiKey(key),
+			keyPrefix: key.substring(0, 8),
+		})),
+	),
+);
+const unknownKey = generateApiKey();
+
+const cache = new ApiKeyCache();
+let i = 0;
+
+describe("valid API key verification", () => {
+	bench("uncached", async () => {
+		const keyHash = await hashApiKey(keys[i++ % keys.length]);
+		await loadApiKey(db, keyHash);
+	});
+
+	bench("cached", async () => {
+		const keyHash = await hashApiKey(keys[i++ % keys.length]);
+		await cache.resolve(keyHash, () => loadApiKey(db, keyHash));
+	});
+});
+
+describe("unknown API key rejection", () => {
+	bench("uncached", async () => {
+		await loadApiKey(db, await hashApiKey(unknownKey));
+	});
+
+	bench("negative cache", async () => {
+		const keyHash = await hashApiKey(unknownKey);
+		await cache.resolve(keyHash, () => loadApiKey(db, keyHash));
+	});
+});
@@ -0,0 +1,262 @@
+import { eq } from "drizzle-orm";
+import { Hono } from "hono";
+import { beforeEach, describe, expect, it } from "vitest";
+import { signJwt } from "../auth/crypto";
+import { type Database, createDatabase } from "../db/client";
+import { apiKeys } from "../db/schema";
+import {
+	ApiKeyCache,
+	ApiKeyUsageTracker,
+	getApiKeyCache,
+	isWellFormedApiKey,
+} from "../middleware/api-key-cache";
+import { authMiddleware } from "../middleware/auth";
+import apiKeysApp from "../rbac/api-keys";
+
+const CREATE_TABLES = `
+	CREATE TABLE api_keys (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		name TEXT NOT NULL,
+		key_hash TEXT NOT NULL UNIQUE,
+		key_prefix TEXT NOT NULL,
+		created_at TEXT NOT NULL,
+		revoked_at TEXT,
+		last_used_at TEXT
+	);
+	CREATE TABLE audit_logs (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		event_type TEXT NOT NULL,
+		user_id TEXT,
+		ip_address TEXT NOT NULL,
+		timestamp TEXT NOT NULL,
+		metadata TEXT
+	);
+`;
+
+const TEST_JWT_SECRET = "test-secret-for-api-key-cache";
+const env = { JWT_SECRET: TEST_JWT_SECRET };
+
+let db: Database;
+let app: Hono;
+let jwt: string;
+
+beforeEach(async () => {
+	db = createDatabase({ url: "file::memory:" });
+	for (const stmt of CREATE_TABLES.split(";").filter((s) => s.trim())) {
+		await db.run(stmt);
+	}
+
+	const testApp = new Hono<{ Variables: { db: Database } }>();
+	testApp.use("*", async (c, next) => {
+		c.set("db", db);
+		await next();
+	});
+	const protectedApiKeys = new Hono();
+	protectedApiKeys.use("*", authMiddleware());
+	protectedApiKeys.route("/", apiKeysApp);
+	testApp.route("/api-keys", protectedApiKeys);
+	app = testApp;
+
+	jwt = await signJwt({ sub: "1" }, TEST_JWT_SECRET);
+});
+
+async function createKey(name = "cache-test-key") {
+	const res = await app.request(
+		"/api-keys",
+		{
+			method: "POST",
+			headers: {
+				"Content-Type": "application/json",
+				Authorization: `Bearer ${jwt}`,
+			},
+			body: JSON.stringify({ name }),
+		},
+		env,
+	);
+	return (await res.json()) as { id: number; key: string };
+}
+
+function listWith(key: string) {
+	return app.request(
+		"/api-keys",
+		{ headers: { Authorization: `Bearer ${key}` } },
+		env,
+	);
+}
+
+describe("ApiKeyCache", () => {
+	it("serves repeated lookups without reloading", async () => {
+		const cache = new ApiKeyCache();
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return { keyId: 1, userId: 7 };
+		};
+
+		const first = await cache.resolve("hash", load);
+		const second = await cache.resolve("hash", load);
+
+		expect(first).toEqual({ identity: { keyId: 1, userId: 7 }, hit: false });
+		expect(second).toEqual({ identity: { keyId: 1, userId: 7 }, hit: true });
+		expect(loads).toBe(1);
+	});
+
+	it("reloads once an entry has expired", async () => {
+		const cache = new ApiKeyCache({ ttlMs: 0 });
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return { keyId: 1, userId: 7 };
+		};
+
+		await cache.resolve("hash", load);
+		await cache.resolve("hash", load);
+
+		expect(loads).toBe(2);
+	});
+
+	it("answers unknown hashes from the negative cache", async () => {
+		const cache = new ApiKeyCache();
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return null;
+		};
+
+		await cache.resolve("bogus", load);
+		const again = await cache.resolve("bogus", load);
+
+		expect(again).toEqual({ identity: null, hit: true });
+		expect(loads).toBe(1);
+		expect(cache.stats().negativeHits).toBe(1);
+	});
+
+	it("bounds the negative cache, evicting the oldest hashes", async () => {
+		const cache = new ApiKeyCache({ maxNegativeEntries: 2 });
+		const load = async () => null;
+
+		await cache.resolve("a", load);
+		await cache.resolve("b", load);
+		await cache.resolve("c", load);
+
+		expect(cache.stats().negativeSize).toBe(2);
+		const evicted = await cache.resolve("a", load);
+		expect(evicted.hit).toBe(false);
+	});
+
+	it("does not cache a key revoked while it was loading", async () => {
+		const cache = new ApiKeyCache();
+		const load = async () => {
+			cache.revoke("hash");
+			return { keyId: 1, userId: 7 };
+		};
+
+		await cache.resolve("hash", load);
+		const next = await cache.resolve("hash", async () => ({
+			keyId: 1,
+			userId: 7,
+		}));
+
+		expect(next).toEqual({ identity: null, hit: true });
+	});
+
+	it("forgets a negative answer when the hash becomes valid", async () => {
+		const cache = new ApiKeyCache();
+		await cache.resolve("hash", async () => null);
+
+		cache.forget("hash");
+		const result = await cache.resolve("hash", async () => ({
+			keyId: 2,
+			userId: 3,
+		}));
+
+		expect(result.identity).toEqual({ keyId: 2, userId: 3 });
+	});
+});
+
+describe("ApiKeyUsageTracker", () => {
+	it("records each key at most once per debounce window", () => {
+		const tracker = new ApiKeyUsageTracker({ debounceMs: 1000 });
+
+		expect(tracker.record(1, 0)).toBe(true);
+		expect(tracker.record(1, 500)).toBe(false);
+		expect(tracker.record(2, 500)).toBe(true);
+		expect(tracker.record(1, 1000)).toBe(true);
+	});
+
+	it("writes pending stamps in one flush", async () => {
+		await db.insert(apiKeys).values([
+			{ userId: 1, name: "a", keyHash: "h1", keyPrefix: "crb_aaaa" },
+			{ userId: 1, name: "b", keyHash: "h2", keyPrefix: "crb_bbbb" },
+		]);
+		const tracker = new ApiKeyUsageTracker();
+		const now = Date.UTC(2025, 0, 1);
+
+		tracker.record(1, now);
+		tracker.record(2, now);
+		await tracker.flush(db);
+
+		const rows = await db
+			.select({ lastUsedAt: apiKeys.lastUsedAt })
+			.from(apiKeys)
+			.all();
+		expect(rows.map((r) => r.lastUsedAt)).toEqual([
+			new Date(now).toISOString(),
+			new Date(now).toISOString(),
+		]);
+		expect(tracker.stats()).toEqual({ written: 2, failed: 0, pending: 0 });
+	});
+});
+
+describe("authMiddleware API key fast path", () => {
+	it("recognises generated key shapes only", () => {
+		expect(isWellFormedApiKey(`crb_${"a1".repeat(32)}`)).toBe(true);
+		expect(isWellFormedApiKey("crb_invalidkeythatdoesnotexist")).toBe(false);
+		expect(isWellFormedApiKey(`crb_${"A1".repeat(32)}`)).toBe(false);
+	});
+
+	it("rejects malformed keys without a lookup", async () => {
+		const res = await listWith("crb_invalidkeythatdoesnotexist");
+
+		expect(res.status).toBe(401);
+		expect(getApiKeyCache(db).stats().misses).toBe(0);
+	});
+
+	it("serves a repeat request from the cache", async () => {
+		const { key } = await createKey();
+
+		expect((await listWith(key)).status).toBe(200);
+		expect((await listWith(key)).status).toBe(200);
+
+		const stats = getApiKeyCache(db).stats();
+		expect(stats.misses).toBe(1);
+		expect(stats.hits).toBe(1);
+	});
+
+	it("rejects a cached key as soon as it is revoked", async () => {
+		const { id, key } = await createKey();
+		expect((await listWith(key)).status).toBe(200);
+
+		await app.request(
+			`/api-keys/${id}`,
+			{ method: "DELETE", headers: { Authorization: `Bearer ${jwt}` } },
+			env,
+		);
+
+		expect((await listWith(key)).status).toBe(401);
+	});
+
+	it("stamps last_used_at on use", async () => {
+		const { id, key } = await createKey();
+
+		await listWith(key);
+
+		const row = await db
+			.select({ lastUsedAt: apiKeys.lastUsedAt })
+			.from(apiKeys)
+			.where(eq(apiKeys.id, id))
+			.get();
+		expect(row?.lastUsedAt).toBeTruthy();
+	});
+});
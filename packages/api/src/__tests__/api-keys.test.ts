@@ -62,7 +62,8 @@ const CREATE_TABLES = `
 		key_hash TEXT NOT NULL UNIQUE,
 		key_prefix TEXT NOT NULL,
 		created_at TEXT NOT NULL,
-		revoked_at TEXT
+		revoked_at TEXT,
+		last_used_at TEXT
 	);
 	CREATE TABLE audit_logs (
 		id INTEGER PRIMARY KEY AUTOINCREMENT,
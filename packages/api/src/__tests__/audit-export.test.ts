@@ -0,0 +1,259 @@
+import { mkdtemp, readFile, rm } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { and, asc, lt } from "drizzle-orm";
+import { Hono } from "hono";
+import { afterEach, beforeEach, describe, expect, it } from "vitest";
+import { type Database, createDatabase } from "../db/client";
+import { auditLogs } from "../db/schema";
+import auditLogsApp, { exportAuditLogs, pastCursor } from "../rbac/audit-logs";
+import { archiveAuditLogs, throughRow } from "../rbac/audit-retention";
+import { FileSystemArchiveStore } from "../rbac/fs-archive-store";
+
+const CREATE_AUDIT_LOGS = `
+	CREATE TABLE audit_logs (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		event_type TEXT NOT NULL,
+		user_id TEXT,
+		ip_address TEXT NOT NULL,
+		timestamp TEXT NOT NULL,
+		metadata TEXT
+	)
+`;
+
+let db: Database;
+let app: Hono;
+
+beforeEach(async () => {
+	db = createDatabase({ url: "file::memory:" });
+	await db.run(CREATE_AUDIT_LOGS);
+
+	// Auth is covered elsewhere; mount the routes directly
+	const testApp = new Hono<{ Variables: { db: Database } }>();
+	testApp.use("*", async (c, next) => {
+		c.set("db", db);
+		await next();
+	});
+	testApp.route("/audit-logs", auditLogsApp);
+	app = testApp;
+});
+
+async function seedLogs(count: number, start = Date.UTC(2024, 0, 1)) {
+	await db.insert(auditLogs).values(
+		Array.from({ length: count }, (_, i) => ({
+			eventType: i % 2 === 0 ? "login" : "refresh",
+			userId: "1",
+			ipAddress: "127.0.0.1",
+			timestamp: new Date(start + i * 60_000).toISOString(),
+		})),
+	);
+}
+
+function parseNdjson(text: string) {
+	return text
+		.split("\n")
+		.filter((line) => line.trim())
+		.map((line) => JSON.parse(line) as { id: number; eventType: string });
+}
+
+async function gunzip(data: ArrayBuffer | Uint8Array) {
+	const stream = new Blob([data])
+		.stream()
+		.pipeThrough(new DecompressionStream("gzip"));
+	return new Response(stream).text();
+}
+
+describe("exportAuditLogs", () => {
+	it("streams every row oldest first across chunk boundaries", async () => {
+		await seedLogs(7);
+
+		const text = await new Response(exportAuditLogs(db, undefined, 3)).text();
+		const rows = parseNdjson(text);
+
+		expect(rows.map((r) => r.id)).toEqual([1, 2, 3, 4, 5, 6, 7]);
+	});
+
+	it("emits one chunk per pull", async () => {
+		await seedLogs(5);
+
+		const reader = exportAuditLogs(db, undefined, 2).getReader();
+		const chunks: number[] = [];
+		for (;;) {
+			const { done, value } = await reader.read();
+			if (done) break;
+			chunks.push(parseNdjson(new TextDecoder().decode(value)).length);
+		}
+
+		expect(chunks).toEqual([2, 2, 1]);
+	});
+
+	it("seeks each chunk from the cursor instead of rescanning", async () => {
+		await db.run(
+			"CREATE INDEX audit_logs_timestamp_id_idx ON audit_logs (timestamp, id)",
+		);
+		const query = db
+			.select()
+			.from(auditLogs)
+			.where(pastCursor({ timestamp: "2024-01-01T00:00:00.000Z", id: 10 }, "asc"))
+			.orderBy(asc(auditLogs.timestamp), asc(auditLogs.id))
+			.limit(500)
+			.toSQL();
+
+		const result = await db.$client.execute({
+			sql: `EXPLAIN QUERY PLAN ${query.sql}`,
+			args: query.params as (string | number)[],
+		});
+
+		expect(result.rows.map((row) => String(row.detail)).join("\n")).toMatch(
+			/SEARCH audit_logs USING INDEX audit_logs_timestamp_id_idx \(timestamp>\?\)/,
+		);
+	});
+});
+
+describe("GET /audit-logs/export", () => {
+	it("returns NDJSON filtered by event type", async () => {
+		await seedLogs(6);
+
+		const res = await app.request("/audit-logs/export?event_type=login");
+
+		expect(res.status).toBe(200);
+		expect(res.headers.get("Content-Type")).toBe("application/x-ndjson");
+		const rows = parseNdjson(await res.text());
+		expect(rows).toHaveLength(3);
+		for (const row of rows) {
+			expect(row.eventType).toBe("login");
+		}
+	});
+
+	it("returns gzip-compressed NDJSON on request", async () => {
+		await seedLogs(4);
+
+		const res = await app.request("/audit-logs/export?compress=gzip");
+
+		expect(res.status).toBe(200);
+		expect(res.headers.get("Content-Type")).toBe("application/gzip");
+		const rows = parseNdjson(await gunzip(await res.arrayBuffer()));
+		expect(rows).toHaveLength(4);
+	});
+
+	it("rejects an invalid time range", async () => {
+		const res = await app.request("/audit-logs/export?to=not-a-date");
+		expect(res.status).toBe(400);
+	});
+});
+
+describe("archiveAuditLogs", () => {
+	let archiveDir: string;
+
+	beforeEach(async () => {
+		archiveDir = await mkdtemp(join(tmpdir(), "cerberus-archive-"));
+	});
+
+	afterEach(async () => {
+		await rm(archiveDir, { recursive: true, force: true });
+	});
+
+	it("archives and deletes rows older than the retention window", async () => {
+		const now = new Date(Date.UTC(2024, 6, 1));
+		await seedLogs(5, Date.UTC(2024, 0, 1));
+		await seedLogs(2, now.getTime() - 60 * 60 * 1000);
+
+		const store = new FileSystemArchiveStore(archiveDir);
+		const result = await archiveAuditLogs(db, store, {
+			retentionDays: 30,
+			batchSize: 2,
+			now,
+		});
+
+		expect(result.archived).toBe(5);
+		expect(result.archives).toHaveLength(3);
+
+		const remaining = await db.select().from(auditLogs).all();
+		expect(remaining).toHaveLength(2);
+
+		const archived = [];
+		for (const key of result.archives) {
+			const blob = await readFile(join(archiveDir, key));
+			archived.push(...parseNdjson(await gunzip(blob)));
+		}
+		expect(archived.map((r) => r.id)).toEqual([1, 2, 3, 4, 5]);
+	});
+
+	it("stops after the configured number of batches", async () => {
+		const now = new Date(Date.UTC(2024, 6, 1));
+		await seedLogs(10, Date.UTC(2024, 0, 1));
+
+		const result = await archiveAuditLogs(
+			db,
+			new FileSystemArchiveStore(archiveDir),
+			{ retentionDays: 30, batchSize: 3, maxBatches: 2, now },
+		);
+
+		expect(result.archived).toBe(6);
+		expect(await db.select().from(auditLogs).all()).toHaveLength(4);
+	});
+
+	it("keeps recent rows whose ids fall inside an archived range", async () => {
+		const now = new Date(Date.UTC(2024, 6, 1));
+		await seedLogs(2, Date.UTC(2024, 0, 1));
+		await seedLogs(1, now.getTime() - 60 * 60 * 1000);
+		await seedLogs(2, Date.UTC(2024, 0, 2));
+
+		const result = await archiveAuditLogs(
+			db,
+			new FileSystemArchiveStore(archiveDir),
+			{ retentionDays: 30, batchSize: 10, now },
+		);
+
+		expect(result.archived).toBe(4);
+		const remaining = await db.select().from(auditLogs).all();
+		expect(remaining.map((r) => r.id)).toEqual([3]);
+	});
+
+	it("seeks the timestamp index to read and delete each batch", async () => {
+		await db.run(
+			"CREATE INDEX audit_logs_timestamp_id_idx ON audit_logs (timestamp, id)",
+		);
+		const cutoff = "2024-06-01T00:00:00.000Z";
+		const select = db
+			.select()
+			.from(auditLogs)
+			.where(lt(auditLogs.timestamp, cutoff))
+			.orderBy(asc(auditLogs.timestamp), asc(auditLogs.id))
+			.limit(1000)
+			.toSQL();
+		const remove = db
+			.delete(auditLogs)
+			.where(
+				and(
+					lt(auditLogs.timestamp, cutoff),
+					throughRow({ timestamp: "2024-01-01T00:00:00.000Z", id: 10 }),
+				),
+			)
+			.toSQL();
+
+		for (const query of [select, remove]) {
+			const result = await db.$client.execute({
+				sql: `EXPLAIN QUERY PLAN ${query.sql}`,
+				args: query.params as (string | number)[],
+			});
+			expect(result.rows.map((row) => String(row.detail)).join("\n")).toMatch(
+				/SEARCH audit_logs USING INDEX audit_logs_timestamp_id_idx \(timestamp<\?\)/,
+			);
+		}
+	});
+
+	it("stops once the time budget is spent", async () => {
+		const now = new Date(Date.UTC(2024, 6, 1));
+		await seedLogs(4, Date.UTC(2024, 0, 1));
+
+		const result = await archiveAuditLogs(
+			db,
+			new FileSystemArchiveStore(archiveDir),
+			{ retentionDays: 30, batchSize: 2, timeBudgetMs: 0, now },
+		);
+
+		expect(result.archived).toBe(0);
+		expect(await db.select().from(auditLogs).all()).toHaveLength(4);
+	});
+});
@@ -1,4 +1,4 @@
-import { eq } from "drizzle-orm";
+import { and, desc, eq } from "drizzle-orm";
 import { Hono } from "hono";
 import { beforeEach, describe, expect, it } from "vitest";
 import { signJwt } from "../auth/crypto";
@@ -10,7 +10,7 @@ import { type Database, createDatabase } from "../db/client";
 import { auditLogs } from "../db/schema";
 import { authMiddleware } from "../middleware/auth";
 import { requirePermission } from "../middleware/authorization";
-import auditLogsApp from "../rbac/audit-logs";
+import auditLogsApp, { pastCursor } from "../rbac/audit-logs";
 import rolesApp from "../rbac/roles";
 import seedApp from "../rbac/seed";
 
@@ -350,16 +350,16 @@ describe("GET /audit-logs endpoint", () => {
 		expect(res.status).toBe(200);
 		const body = (await res.json()) as {
 			data: unknown[];
-			pagination: { page: number; limit: number; total: number };
+			pagination: { limit: number; next_cursor: string | null; total?: number };
 		};
 		expect(body).toHaveProperty("data");
 		expect(body).toHaveProperty("pagination");
 		expect(Array.isArray(body.data)).toBe(true);
-		expect(body.pagination).toHaveProperty("page");
 		expect(body.pagination).toHaveProperty("limit");
-		expect(body.pagination).toHaveProperty("total");
+		expect(body.pagination).toHaveProperty("next_cursor");
+		// The total is opt-in to avoid a full count on every page
+		expect(body.pagination).not.toHaveProperty("total");
 		expect(body.data.length).toBeGreaterThan(0);
-		expect(body.pagination.total).toBeGreaterThan(0);
 	});
 
 	it("filters by event_type", async () => {
@@ -385,7 +385,7 @@ describe("GET /audit-logs endpoint", () => {
 
 		// Filter by event_type=login
 		const res = await testApp.request(
-			"/audit-logs?event_type=login",
+			"/audit-logs?event_type=login&include_total=true",
 			{
 				method: "GET",
 				headers: { Authorization: `Bearer ${loginBody.access_token}` },
@@ -465,6 +465,143 @@ describe("GET /audit-logs endpoint", () => {
 	});
 });
 
+describe("GET /audit-logs keyset pagination", () => {
+	async function seedAdminAndLogs(count: number) {
+		const { body: regBody } = await registerUser("admin@example.com", "admin-pass-123");
+		await testApp.request(
+			"/seed",
+			{
+				method: "POST",
+				headers: { "Content-Type": "application/json", "X-Setup-Token": TEST_SETUP_TOKEN },
+				body: JSON.stringify({ userId: regBody.id }),
+			},
+			env,
+		);
+		const { body: loginBody } = await loginUser("admin@example.com", "admin-pass-123");
+
+		await db.delete(auditLogs);
+		await db.insert(auditLogs).values(
+			Array.from({ length: count }, (_, i) => ({
+				eventType: i % 2 === 0 ? "login" : "refresh",
+				userId: String(i % 3),
+				ipAddress: "127.0.0.1",
+				// Pairs share a timestamp so the id tie-breaker is exercised
+				timestamp: new Date(Date.UTC(2024, 0, 1, 0, Math.floor(i / 2))).toISOString(),
+			})),
+		);
+
+		return loginBody.access_token;
+	}
+
+	async function getPage(token: string, query: string) {
+		const res = await testApp.request(
+			`/audit-logs?${query}`,
+			{ method: "GET", headers: { Authorization: `Bearer ${token}` } },
+			env,
+		);
+		return {
+			res,
+			body: (await res.json()) as {
+				data: Array<{ id: number; eventType: string; userId: string; timestamp: string }>;
+				pagination: { limit: number; next_cursor: string | null; total?: number };
+			},
+		};
+	}
+
+	it("walks every row exactly once in timestamp, id descending order", async () => {
+		const token = await seedAdminAndLogs(9);
+
+		const seen: Array<{ id: number; timestamp: string }> = [];
+		let cursor: string | null = null;
+		do {
+			// Bound the range so the authz_granted rows these requests write stay out
+			const base = "limit=4&to=2025-01-01T00:00:00.000Z";
+			const query: string = cursor ? `${base}&cursor=${cursor}` : base;
+			const { res, body } = await getPage(token, query);
+			expect(res.status).toBe(200);
+			seen.push(...body.data);
+			cursor = body.pagination.next_cursor;
+		} while (cursor);
+
+		expect(seen).toHaveLength(9);
+		expect(new Set(seen.map((r) => r.id)).size).toBe(9);
+		const sorted = [...seen].sort((a, b) =>
+			a.timestamp === b.timestamp ? b.id - a.id : b.timestamp.localeCompare(a.timestamp),
+		);
+		expect(seen).toEqual(sorted);
+	});
+
+	it("returns a null next_cursor on the last page", async () => {
+		const token = await seedAdminAndLogs(3);
+
+		const { body } = await getPage(token, "limit=3&to=2025-01-01T00:00:00.000Z");
+		expect(body.data).toHaveLength(3);
+		expect(body.pagination.next_cursor).toBeNull();
+	});
+
+	it("filters by user and time range", async () => {
+		const token = await seedAdminAndLogs(12);
+
+		const { body } = await getPage(
+			token,
+			"user_id=1&from=2024-01-01T00:01:00.000Z&to=2024-01-01T00:05:00.000Z&include_total=1",
+		);
+
+		expect(body.data.length).toBeGreaterThan(0);
+		for (const entry of body.data) {
+			expect(entry.userId).toBe("1");
+			expect(entry.timestamp >= "2024-01-01T00:01:00.000Z").toBe(true);
+			expect(entry.timestamp < "2024-01-01T00:05:00.000Z").toBe(true);
+		}
+		expect(body.pagination.total).toBe(body.data.length);
+	});
+
+	it("seeks the timestamp indexes to the cursor instead of scanning", async () => {
+		await db.run("CREATE INDEX audit_logs_timestamp_id_idx ON audit_logs (timestamp, id)");
+		await db.run(
+			"CREATE INDEX audit_logs_event_type_timestamp_id_idx ON audit_logs (event_type, timestamp, id)",
+		);
+		const cursor = { timestamp: "2024-01-01T00:00:00.000Z", id: 10 };
+
+		async function plan(filter?: ReturnType<typeof eq>) {
+			const query = db
+				.select()
+				.from(auditLogs)
+				.where(and(filter, pastCursor(cursor, "desc")))
+				.orderBy(desc(auditLogs.timestamp), desc(auditLogs.id))
+				.limit(21)
+				.toSQL();
+			const result = await db.$client.execute({
+				sql: `EXPLAIN QUERY PLAN ${query.sql}`,
+				args: query.params as (string | number)[],
+			});
+			return result.rows.map((row) => String(row.detail)).join("\n");
+		}
+
+		expect(await plan()).toMatch(
+			/SEARCH audit_logs USING INDEX audit_logs_timestamp_id_idx \(timestamp<\?\)/,
+		);
+		expect(await plan(eq(auditLogs.eventType, "login"))).toMatch(
+			/SEARCH audit_logs USING INDEX audit_logs_event_type_timestamp_id_idx \(event_type=\? AND timestamp<\?\)/,
+		);
+	});
+
+	it("rejects a malformed cursor", async () => {
+		const token = await seedAdminAndLogs(1);
+
+		const { res, body } = await getPage(token, "cursor=not-a-cursor");
+		expect(res.status).toBe(400);
+		expect(body).toEqual({ error: "Invalid cursor" });
+	});
+
+	it("rejects an invalid time range", async () => {
+		const token = await seedAdminAndLogs(1);
+
+		const { res } = await getPage(token, "from=yesterday");
+		expect(res.status).toBe(400);
+	});
+});
+
 describe("Audit entry field completeness", () => {
 	it("every audit entry has event_type, ip_address, and timestamp", async () => {
 		// Do a few operations to create audit entries
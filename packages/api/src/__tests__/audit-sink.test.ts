@@ -0,0 +1,188 @@
+import { Hono } from "hono";
+import { beforeEach, describe, expect, it } from "vitest";
+import { type Database, createDatabase } from "../db/client";
+import { auditLogs } from "../db/schema";
+import { AuditSink, auditBuffer, recordAuditLog } from "../middleware/audit";
+
+const CREATE_AUDIT_LOGS = `
+	CREATE TABLE audit_logs (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		event_type TEXT NOT NULL,
+		user_id TEXT,
+		ip_address TEXT NOT NULL,
+		timestamp TEXT NOT NULL,
+		metadata TEXT
+	)
+`;
+
+function entry(eventType: string) {
+	return { eventType, userId: "1", ipAddress: "1.2.3.4" };
+}
+
+let db: Database;
+
+beforeEach(async () => {
+	db = createDatabase({ url: "file::memory:" });
+	await db.run(CREATE_AUDIT_LOGS);
+});
+
+describe("AuditSink", () => {
+	it("holds entries until flushed, then writes them all", async () => {
+		const sink = new AuditSink(db, { maxBatchSize: 2 });
+		sink.enqueue(entry("login"));
+		sink.enqueue(entry("refresh"));
+		sink.enqueue(entry("revoke"));
+
+		expect(await db.select().from(auditLogs).all()).toHaveLength(0);
+
+		await sink.flush();
+
+		const rows = await db.select().from(auditLogs).all();
+		expect(rows.map((r) => r.eventType)).toEqual(["login", "refresh", "revoke"]);
+		expect(sink.stats()).toMatchObject({ queued: 0, written: 3 });
+	});
+
+	it("writes entries queued while a finished drain is settling", async () => {
+		const sink = new AuditSink(db);
+		const internals = sink as unknown as { drain: () => Promise<void> };
+		const drain = internals.drain.bind(sink);
+		let late: Promise<void> | undefined;
+		internals.drain = async () => {
+			await drain();
+			// Another request flushes after the loop emptied the queue but
+			// before the in-flight flush has settled
+			if (!late) {
+				sink.enqueue(entry("late"));
+				late = sink.flush();
+			}
+		};
+
+		sink.enqueue(entry("early"));
+		await sink.flush();
+		await late;
+
+		const rows = await db.select().from(auditLogs).all();
+		expect(rows.map((r) => r.eventType)).toEqual(["early", "late"]);
+	});
+
+	it("flushes on size or age", async () => {
+		const sink = new AuditSink(db, { maxBatchSize: 2, maxAgeMs: 60_000 });
+		expect(sink.shouldFlush()).toBe(false);
+
+		sink.enqueue(entry("login"));
+		expect(sink.shouldFlush()).toBe(false);
+
+		sink.enqueue(entry("login"));
+		expect(sink.shouldFlush()).toBe(true);
+
+		const aged = new AuditSink(db, { maxBatchSize: 100, maxAgeMs: 0 });
+		aged.enqueue(entry("login"));
+		expect(aged.shouldFlush()).toBe(true);
+	});
+
+	it("drops the oldest entries beyond the queue cap", async () => {
+		const sink = new AuditSink(db, { maxBatchSize: 1, maxQueueSize: 2 });
+		sink.enqueue(entry("a"));
+		sink.enqueue(entry("b"));
+		sink.enqueue(entry("c"));
+
+		await sink.flush();
+
+		const rows = await db.select().from(auditLogs).all();
+		expect(rows.map((r) => r.eventType)).toEqual(["b", "c"]);
+		expect(sink.stats().dropped).toBe(1);
+	});
+
+	it("applies per-event sample rates", async () => {
+		const sink = new AuditSink(db, { sampleRates: { authz_granted: 0 } });
+		sink.enqueue(entry("authz_granted"));
+		sink.enqueue(entry("authz_denied"));
+
+		await sink.flush();
+
+		const rows = await db.select().from(auditLogs).all();
+		expect(rows.map((r) => r.eventType)).toEqual(["authz_denied"]);
+		expect(sink.stats().sampledOut).toBe(1);
+	});
+
+	it("counts failed batches without throwing", async () => {
+		const broken = createDatabase({ url: "file::memory:" });
+		const sink = new AuditSink(broken);
+		sink.enqueue(entry("login"));
+
+		await expect(sink.flush()).resolves.toBeUndefined();
+		expect(sink.stats().failed).toBe(1);
+	});
+});
+
+describe("auditBuffer middleware", () => {
+	function buildApp() {
+		const app = new Hono<{ Variables: { db: Database } }>();
+		app.use("*", async (c, next) => {
+			c.set("db", db);
+			await next();
+		});
+		app.use("*", auditBuffer());
+		app.get("/", async (c) => {
+			await recordAuditLog(c, entry("login"));
+			await recordAuditLog(c, entry("refresh"));
+			return c.json({ ok: true });
+		});
+		return app;
+	}
+
+	it("defers the write to waitUntil when an execution context exists", async () => {
+		const pending: Promise<unknown>[] = [];
+		const executionCtx = {
+			waitUntil: (p: Promise<unknown>) => pending.push(p),
+			passThroughOnException: () => {},
+			props: {},
+		};
+
+		const res = await buildApp().request("/", {}, {}, executionCtx);
+		expect(res.status).toBe(200);
+		expect(pending).toHaveLength(1);
+
+		await Promise.all(pending);
+		expect(await db.select().from(auditLogs).all()).toHaveLength(2);
+	});
+
+	it("writes inline when there is no execution context", async () => {
+		const res = await buildApp().request("/");
+		expect(res.status).toBe(200);
+		expect(await db.select().from(auditLogs).all()).toHaveLength(2);
+	});
+
+	it("reads sample rates from AUDIT_SAMPLE_RATES", async () => {
+		const app = new Hono<{ Variables: { db: Database } }>();
+		app.use("*", async (c, next) => {
+			c.set("db", db);
+			await next();
+		});
+		app.use("*", auditBuffer());
+		app.get("/", async (c) => {
+			await recordAuditLog(c, entry("authz_granted"));
+			return c.json({ ok: true });
+		});
+
+		await app.request("/", {}, { AUDIT_SAMPLE_RATES: '{"authz_granted":0}' });
+		expect(await db.select().from(auditLogs).all()).toHaveLength(0);
+	});
+});
+
+describe("recordAuditLog without the middleware", () => {
+	it("falls back to a direct insert", async () => {
+		const app = new Hono<{ Variables: { db: Database } }>();
+		app.use("*", async (c, next) => {
+			c.set("db", db);
+			await next();
+		});
+		app.get("/", async (c) => {
+			await recordAuditLog(c, entry("login"));
+			return c.json({ ok: true });
+		});
+
+		await app.request("/");
+		expect(await db.select().from(auditLogs).all()).toHaveLength(1);
+	});
+});
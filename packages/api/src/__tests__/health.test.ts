@@ -1,5 +1,5 @@
 import { describe, expect, it } from "vitest";
-import app from "../index";
+import { app } from "../index";
 
 describe("health check", () => {
 	it("returns 200 with db ok when database is configured", async () => {
@@ -0,0 +1,51 @@
+import { describe, expect, it } from "vitest";
+import { parseServerTiming, percentile, runLoad } from "../bench/load";
+
+describe("percentile", () => {
+	it("uses the nearest rank", () => {
+		const sorted = Array.from({ length: 100 }, (_, i) => i + 1);
+		expect(percentile(sorted, 50)).toBe(50);
+		expect(percentile(sorted, 95)).toBe(95);
+		expect(percentile(sorted, 99)).toBe(99);
+		expect(percentile([7], 99)).toBe(7);
+		expect(percentile([], 50)).toBe(0);
+	});
+});
+
+describe("parseServerTiming", () => {
+	it("reads the phase durations", () => {
+		expect(
+			parseServerTiming(
+				'db;dur=1.5;desc="2 queries", crypto;dur=0.25;desc="1 ops", handler;dur=3, total;dur=4.75',
+			),
+		).toEqual({ db: 1.5, crypto: 0.25, handler: 3 });
+		expect(parseServerTiming(null)).toBeNull();
+	});
+});
+
+describe("runLoad", () => {
+	it("issues the requested number of calls across workers", async () => {
+		const workers = new Set<number>();
+		let calls = 0;
+
+		const result = await runLoad(
+			"stub",
+			async (worker) => {
+				workers.add(worker);
+				calls += 1;
+				return new Response("ok", {
+					status: calls % 5 === 0 ? 500 : 200,
+					headers: { "Server-Timing": "db;dur=2, crypto;dur=1, handler;dur=3" },
+				});
+			},
+			{ requests: 20, concurrency: 4 },
+		);
+
+		expect(calls).toBe(20);
+		expect(workers).toEqual(new Set([0, 1, 2, 3]));
+		expect(result.requests).toBe(20);
+		expect(result.errors).toBe(4);
+		expect(result.phases).toEqual({ db: 2, crypto: 1, handler: 3 });
+		expect(result.p50).toBeLessThanOrEqual(result.p99);
+	});
+});
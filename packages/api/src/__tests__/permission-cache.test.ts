@@ -0,0 +1,336 @@
+import { Hono } from "hono";
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import { signJwt } from "../auth/crypto";
+import { type Database, createDatabase, getDatabase } from "../db/client";
+import { app as workerApp } from "../index";
+import { authMiddleware } from "../middleware/auth";
+import { requirePermission } from "../middleware/authorization";
+import {
+	PermissionCache,
+	getPermissionCache,
+} from "../middleware/permission-cache";
+import rolesApp from "../rbac/roles";
+import userRolesApp from "../rbac/user-roles";
+
+const CREATE_TABLES = `
+	CREATE TABLE users (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		email TEXT NOT NULL UNIQUE,
+		hashed_password TEXT NOT NULL,
+		created_at TEXT NOT NULL,
+		updated_at TEXT NOT NULL
+	);
+	CREATE TABLE roles (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		name TEXT NOT NULL UNIQUE,
+		description TEXT,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE permissions (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		permission TEXT NOT NULL UNIQUE,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE role_permissions (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		role_id INTEGER NOT NULL,
+		permission_id INTEGER NOT NULL,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE user_roles (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		role_id INTEGER NOT NULL,
+		created_at TEXT NOT NULL
+	);
+`;
+
+const TEST_JWT_SECRET = "test-secret-for-permission-cache";
+
+// Minimal Map-backed stand-in for a KV namespace
+class MemoryKV {
+	data = new Map<string, string>();
+
+	async get(key: string, type?: "json") {
+		const value = this.data.get(key);
+		if (value === undefined) return null;
+		return type === "json" ? JSON.parse(value) : value;
+	}
+
+	async put(key: string, value: string) {
+		this.data.set(key, value);
+	}
+}
+
+// One location's view of a shared store: like KV, each read is cached at the
+// edge for 60s, so writes from elsewhere can be missed for that long
+class EdgeCachedKV {
+	private cache = new Map<string, { value: string | null; readAt: number }>();
+
+	constructor(private store: MemoryKV) {}
+
+	async get(key: string, type?: "json") {
+		let cached = this.cache.get(key);
+		if (!cached || Date.now() - cached.readAt >= 60_000) {
+			cached = { value: this.store.data.get(key) ?? null, readAt: Date.now() };
+			this.cache.set(key, cached);
+		}
+		if (cached.value === null) return null;
+		return type === "json" ? JSON.parse(cached.value) : cached.value;
+	}
+
+	async put(key: string, value: string) {
+		this.store.data.set(key, value);
+		this.cache.delete(key);
+	}
+}
+
+function asKV(kv: MemoryKV | EdgeCachedKV) {
+	return kv as unknown as KVNamespace;
+}
+
+describe("PermissionCache", () => {
+	it("loads once and serves subsequent lookups from memory", async () => {
+		const cache = new PermissionCache();
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return ["manage_roles"];
+		};
+
+		const first = await cache.resolve(1, load);
+		const second = await cache.resolve(1, load);
+
+		expect(first.hit).toBe(false);
+		expect(second.hit).toBe(true);
+		expect(second.permissions.has("manage_roles")).toBe(true);
+		expect(loads).toBe(1);
+		expect(cache.stats()).toMatchObject({ hits: 1, misses: 1, size: 1 });
+	});
+
+	it("reloads after the TTL expires", async () => {
+		const cache = new PermissionCache({ ttlMs: 0 });
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return [];
+		};
+
+		await cache.resolve(1, load);
+		await cache.resolve(1, load);
+
+		expect(loads).toBe(2);
+	});
+
+	it("evicts the least recently used entry when full", async () => {
+		const cache = new PermissionCache({ maxEntries: 2 });
+		const load = async () => ["p"];
+
+		await cache.resolve(1, load);
+		await cache.resolve(2, load);
+		await cache.resolve(1, load);
+		await cache.resolve(3, load);
+
+		expect(cache.stats().size).toBe(2);
+		expect((await cache.resolve(1, load)).hit).toBe(true);
+		expect((await cache.resolve(2, load)).hit).toBe(false);
+	});
+
+	it("drops all entries when invalidated", async () => {
+		const cache = new PermissionCache();
+		const load = async () => ["p"];
+
+		await cache.resolve(1, load);
+		await cache.invalidate();
+
+		expect((await cache.resolve(1, load)).hit).toBe(false);
+		expect(cache.stats().invalidations).toBe(1);
+	});
+
+	it("shares resolved sets and the version stamp through KV", async () => {
+		const kv = new MemoryKV();
+		const a = new PermissionCache({ ttlMs: 0 });
+		const b = new PermissionCache({ ttlMs: 0 });
+		let loads = 0;
+		const load = async () => {
+			loads += 1;
+			return ["manage_users"];
+		};
+
+		await a.resolve(1, load, asKV(kv));
+		const fromB = await b.resolve(1, load, asKV(kv));
+		expect(loads).toBe(1);
+		expect(fromB.permissions.has("manage_users")).toBe(true);
+		expect(b.stats().kvHits).toBe(1);
+
+		await a.invalidate(asKV(kv));
+		await b.resolve(1, load, asKV(kv));
+		expect(loads).toBe(2);
+	});
+
+	describe("across isolates with edge-cached KV reads", () => {
+		afterEach(() => {
+			vi.useRealTimers();
+		});
+
+		it("observes a remote invalidation within 60s plus the TTL", async () => {
+			vi.useFakeTimers();
+			const start = Date.UTC(2024, 0, 1);
+			vi.setSystemTime(start);
+
+			const store = new MemoryKV();
+			const here = asKV(new EdgeCachedKV(store));
+			const elsewhere = asKV(new EdgeCachedKV(store));
+			const cache = new PermissionCache({ ttlMs: 30_000 });
+			let granted = ["manage_roles"];
+			const load = async () => granted;
+
+			await cache.resolve(1, load, here);
+			// The role is revoked through another isolate
+			granted = [];
+			await new PermissionCache().invalidate(elsewhere);
+
+			// The stale stamp and the old KV-tier set are still served
+			vi.setSystemTime(start + 59_000);
+			expect(
+				(await cache.resolve(1, load, here)).permissions.has("manage_roles"),
+			).toBe(true);
+
+			vi.setSystemTime(start + 60_000 + 30_000);
+			expect(
+				(await cache.resolve(1, load, here)).permissions.has("manage_roles"),
+			).toBe(false);
+		});
+	});
+});
+
+describe("requirePermission caching", () => {
+	let testApp: Hono;
+	let db: Database;
+	let adminToken: string;
+
+	beforeEach(async () => {
+		db = createDatabase({ url: "file::memory:" });
+		for (const stmt of CREATE_TABLES.split(";").filter((s) => s.trim())) {
+			await db.run(stmt);
+		}
+
+		await db.run("INSERT INTO users (email, hashed_password, created_at, updated_at) VALUES ('admin@test.local', 'x', datetime('now'), datetime('now'))");
+		await db.run("INSERT INTO users (email, hashed_password, created_at, updated_at) VALUES ('user@test.local', 'x', datetime('now'), datetime('now'))");
+		await db.run("INSERT INTO roles (name, description, created_at) VALUES ('__seed__', 'Seed', datetime('now'))");
+		await db.run("INSERT INTO permissions (permission, created_at) VALUES ('manage_roles', datetime('now'))");
+		await db.run("INSERT INTO permissions (permission, created_at) VALUES ('manage_users', datetime('now'))");
+		await db.run("INSERT INTO role_permissions (role_id, permission_id, created_at) VALUES (1, 1, datetime('now'))");
+		await db.run("INSERT INTO role_permissions (role_id, permission_id, created_at) VALUES (1, 2, datetime('now'))");
+		await db.run("INSERT INTO user_roles (user_id, role_id, created_at) VALUES (1, 1, datetime('now'))");
+
+		adminToken = await signJwt({ sub: "1" }, TEST_JWT_SECRET);
+
+		const app = new Hono<{
+			Bindings: { JWT_SECRET: string };
+			Variables: { db: Database; user: { sub: string; iat: number; exp: number } };
+		}>();
+		app.use("*", async (c, next) => {
+			c.set("db", db);
+			await next();
+		});
+		const protectedRoles = new Hono<{
+			Bindings: { JWT_SECRET: string };
+			Variables: { db: Database; user: { sub: string; iat: number; exp: number } };
+		}>();
+		protectedRoles.use("*", authMiddleware());
+		protectedRoles.use("*", requirePermission("manage_roles"));
+		protectedRoles.route("/", rolesApp);
+
+		const protectedUsers = new Hono<{
+			Bindings: { JWT_SECRET: string };
+			Variables: { db: Database; user: { sub: string; iat: number; exp: number } };
+		}>();
+		protectedUsers.use("*", authMiddleware());
+		protectedUsers.use("*", requirePermission("manage_users"));
+		protectedUsers.route("/", userRolesApp);
+
+		app.route("/roles", protectedRoles);
+		app.route("/users", protectedUsers);
+		testApp = app;
+	});
+
+	function request(path: string, token: string, init: RequestInit = {}) {
+		return testApp.request(
+			path,
+			{
+				...init,
+				headers: {
+					"Content-Type": "application/json",
+					Authorization: `Bearer ${token}`,
+				},
+			},
+			{ JWT_SECRET: TEST_JWT_SECRET },
+		);
+	}
+
+	it("serves the second check from cache", async () => {
+		const first = await request("/roles", adminToken);
+		const second = await request("/roles", adminToken);
+
+		expect(first.status).toBe(200);
+		expect(second.status).toBe(200);
+		// Cache state is internal and must not leak into responses
+		expect(second.headers.get("X-Permission-Cache")).toBeNull();
+		expect(getPermissionCache(db).stats()).toMatchObject({ hits: 1, misses: 1 });
+	});
+
+	it("picks up a role assignment immediately", async () => {
+		const userToken = await signJwt({ sub: "2" }, TEST_JWT_SECRET);
+
+		const denied = await request("/roles", userToken);
+		expect(denied.status).toBe(403);
+
+		const assign = await request("/users/2/roles", adminToken, {
+			method: "POST",
+			body: JSON.stringify({ roleId: 1 }),
+		});
+		expect(assign.status).toBe(200);
+
+		const allowed = await request("/roles", userToken);
+		expect(allowed.status).toBe(200);
+	});
+
+	it("picks up a role unassignment immediately", async () => {
+		await request("/roles", adminToken);
+
+		const remove = await request("/users/1/roles/1", adminToken, {
+			method: "DELETE",
+		});
+		expect(remove.status).toBe(200);
+
+		const denied = await request("/roles", adminToken);
+		expect(denied.status).toBe(403);
+	});
+});
+
+describe("worker permission cache", () => {
+	it("is shared by requests with the same database bindings", async () => {
+		const env = { TURSO_DATABASE_URL: "file::memory:", JWT_SECRET: TEST_JWT_SECRET };
+		const db = getDatabase({ url: env.TURSO_DATABASE_URL });
+		for (const stmt of CREATE_TABLES.split(";").filter((s) => s.trim())) {
+			await db.run(stmt);
+		}
+		await db.run("INSERT INTO roles (name, description, created_at) VALUES ('__seed__', 'Seed', datetime('now'))");
+		await db.run("INSERT INTO permissions (permission, created_at) VALUES ('manage_roles', datetime('now'))");
+		await db.run("INSERT INTO role_permissions (role_id, permission_id, created_at) VALUES (1, 1, datetime('now'))");
+		await db.run("INSERT INTO user_roles (user_id, role_id, created_at) VALUES (1, 1, datetime('now'))");
+		const token = await signJwt({ sub: "1" }, TEST_JWT_SECRET);
+
+		for (let i = 0; i < 3; i++) {
+			const res = await workerApp.request(
+				"/roles",
+				{ headers: { Authorization: `Bearer ${token}` } },
+				env,
+			);
+			expect(res.status).toBe(200);
+		}
+
+		expect(getPermissionCache(db).stats()).toMatchObject({ hits: 2, misses: 1 });
+	});
+});
@@ -1,12 +1,14 @@
 import { Hono } from "hono";
-import { beforeEach, describe, expect, it } from "vitest";
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
 import login from "../auth/login";
 import refresh from "../auth/refresh";
 import register from "../auth/register";
 import { createDatabase } from "../db/client";
 import type { Database } from "../db/client";
 import {
+	DurableObjectRateLimitStore,
 	InMemoryRateLimitStore,
+	RateLimitCounter,
 	rateLimiter,
 } from "../middleware/rate-limiter";
 
@@ -187,3 +189,128 @@ describe("rate limiting", () => {
 		expect(res.headers.get("X-RateLimit-Reset")).toBeTruthy();
 	});
 });
+
+describe("sliding window", () => {
+	afterEach(() => {
+		vi.useRealTimers();
+	});
+
+	it("carries the previous window's weighted count across the boundary", async () => {
+		vi.useFakeTimers();
+		vi.setSystemTime(new Date(60_000 * 1000 + 50_000));
+		const store = new InMemoryRateLimitStore();
+
+		for (let i = 0; i < 10; i++) {
+			await store.increment("k", 60_000);
+		}
+
+		// 15s into the next window, 75% of the previous window still overlaps
+		vi.setSystemTime(new Date(60_000 * 1001 + 15_000));
+		expect(await store.increment("k", 60_000)).toBe(9);
+
+		// Two full windows later nothing carries over
+		vi.setSystemTime(new Date(60_000 * 1003));
+		expect(await store.increment("k", 60_000)).toBe(1);
+	});
+
+	it("sweeps expired keys from the in-memory store", async () => {
+		vi.useFakeTimers();
+		vi.setSystemTime(new Date(60_000 * 1000));
+		const store = new InMemoryRateLimitStore(1_000);
+
+		for (let i = 0; i < 100; i++) {
+			await store.increment(`ip-${i}`, 60_000);
+		}
+		expect(store.size).toBe(100);
+
+		vi.setSystemTime(new Date(60_000 * 1002));
+		await store.increment("fresh", 60_000);
+		expect(store.size).toBe(1);
+	});
+});
+
+// In-process stand-in for a Durable Object namespace: one RateLimitCounter per
+// name, backed by Map storage with asynchronous reads and writes.
+function createLocalNamespace() {
+	const objects = new Map<string, RateLimitCounter>();
+
+	function createState() {
+		const data = new Map<string, unknown>();
+		const tick = () => new Promise((resolve) => setTimeout(resolve, 0));
+		return {
+			storage: {
+				async get(key: string) {
+					await tick();
+					return data.get(key);
+				},
+				async put(key: string, value: unknown) {
+					await tick();
+					data.set(key, value);
+				},
+				async deleteAll() {
+					data.clear();
+				},
+				async setAlarm() {},
+			},
+		} as unknown as DurableObjectState;
+	}
+
+	return {
+		idFromName: (name: string) => name,
+		get(id: string) {
+			let object = objects.get(id);
+			if (!object) {
+				object = new RateLimitCounter(createState());
+				objects.set(id, object);
+			}
+			const counter = object;
+			return {
+				fetch: (input: string, init?: RequestInit) =>
+					counter.fetch(new Request(input, init)),
+			};
+		},
+	} as unknown as DurableObjectNamespace;
+}
+
+describe("DurableObjectRateLimitStore", () => {
+	it("counts every concurrent increment", async () => {
+		const store = new DurableObjectRateLimitStore(createLocalNamespace());
+
+		const counts = await Promise.all(
+			Array.from({ length: 50 }, () => store.increment("burst", 60_000)),
+		);
+
+		expect(Math.max(...counts)).toBe(50);
+		expect(new Set(counts).size).toBe(50);
+		expect(await store.get("burst")).toBe(50);
+	});
+
+	it("keeps keys independent", async () => {
+		const store = new DurableObjectRateLimitStore(createLocalNamespace());
+
+		await store.increment("a", 60_000);
+		await store.increment("a", 60_000);
+		await store.increment("b", 60_000);
+
+		expect(await store.get("a")).toBe(2);
+		expect(await store.get("b")).toBe(1);
+	});
+
+	it("enforces the limit through the middleware", async () => {
+		const store = new DurableObjectRateLimitStore(createLocalNamespace());
+		const app = new Hono();
+		app.use("*", rateLimiter({ limit: 3, windowMs: 60_000, store }));
+		app.post("/login", (c) => c.json({ ok: true }));
+
+		const statuses: number[] = [];
+		for (let i = 0; i < 4; i++) {
+			const res = await app.request("/login", {
+				method: "POST",
+				headers: { "X-Forwarded-For": "1.2.3.4" },
+			});
+			statuses.push(res.status);
+		}
+
+		expect(statuses).toEqual([200, 200, 200, 429]);
+	});
+});
@@ -150,14 +150,14 @@ describe("POST /refresh", () => {
 		// Use the refresh token (this should rotate it)
 		await postRefresh(app, { refresh_token: tokens.refresh_token });
 
-		// Try to use the old refresh token again (it was cleaned up during rotation)
+		// Try to use the old refresh token again (it was revoked during rotation)
 		const res = await postRefresh(app, {
 			refresh_token: tokens.refresh_token,
 		});
 
 		expect(res.status).toBe(401);
 		const body = await res.json();
-		expect(body).toEqual({ error: "Invalid refresh token" });
+		expect(body).toEqual({ error: "Refresh token revoked" });
 	});
 
 	it("rejects already-rotated token in a chain", async () => {
@@ -172,11 +172,11 @@ describe("POST /refresh", () => {
 		const resC = await postRefresh(app, { refresh_token: bodyB.refresh_token });
 		expect(resC.status).toBe(200);
 
-		// Try to refresh with B (already rotated and cleaned up) -> should fail
+		// Try to refresh with B (already rotated) -> should fail
 		const res = await postRefresh(app, { refresh_token: bodyB.refresh_token });
 		expect(res.status).toBe(401);
 		const body = await res.json();
-		expect(body).toEqual({ error: "Invalid refresh token" });
+		expect(body).toEqual({ error: "Refresh token revoked" });
 	});
 
 	it("returns 401 for an expired refresh token", async () => {
@@ -239,36 +239,44 @@ describe("POST /refresh", () => {
 		expect(claims!.exp - claims!.iat).toBe(3600);
 	});
 
-	it("cleans up revoked and expired tokens during rotation", async () => {
+	it("revokes the old token and stores its replacement during rotation", async () => {
 		const { app, db } = await setupTestApp();
 		const tokens = await loginAndGetTokens(app);
 
-		// Rotate A -> B (A becomes revoked)
-		const resB = await postRefresh(app, { refresh_token: tokens.refresh_token });
-		expect(resB.status).toBe(200);
-		const bodyB = (await resB.json()) as { refresh_token: string };
-
-		// Insert an expired token directly to simulate a stale expired row
-		await db.run(`
-			INSERT INTO refresh_tokens (token, user_id, expires_at, created_at)
-			VALUES ('manually-expired', 1, '2020-01-01T00:00:00.000Z', '2020-01-01T00:00:00.000Z')
-		`);
-
-		// Rotate B -> C (B becomes revoked; cleanup should remove A, B revoked + expired token)
-		const resC = await postRefresh(app, { refresh_token: bodyB.refresh_token });
-		expect(resC.status).toBe(200);
-		const bodyC = (await resC.json()) as { refresh_token: string };
+		const res = await postRefresh(app, { refresh_token: tokens.refresh_token });
+		expect(res.status).toBe(200);
+		const body = (await res.json()) as { refresh_token: string };
 
-		// Query remaining tokens for user 1
-		const remaining = await db
+		const rows = await db
 			.select()
 			.from(refreshTokens)
 			.where(eq(refreshTokens.userId, 1));
 
-		// Only the latest non-revoked, unexpired token (C) should remain
-		expect(remaining).toHaveLength(1);
-		expect(remaining[0].token).toBe(bodyC.refresh_token);
-		expect(remaining[0].revokedAt).toBeNull();
+		// Stale tokens are left for the scheduled sweeper, not deleted inline
+		expect(rows).toHaveLength(2);
+		const old = rows.find((r) => r.token === tokens.refresh_token);
+		const replacement = rows.find((r) => r.token === body.refresh_token);
+		expect(old?.revokedAt).not.toBeNull();
+		expect(replacement?.revokedAt).toBeNull();
+		expect(replacement?.userId).toBe(1);
+	});
+
+	it("rotates a token only once under concurrent refreshes", async () => {
+		const { app, db } = await setupTestApp();
+		const tokens = await loginAndGetTokens(app);
+
+		const results = await Promise.all([
+			postRefresh(app, { refresh_token: tokens.refresh_token }),
+			postRefresh(app, { refresh_token: tokens.refresh_token }),
+		]);
+
+		const statuses = results.map((r) => r.status).sort();
+		expect(statuses).toEqual([200, 401]);
+
+		const active = (await db.select().from(refreshTokens)).filter(
+			(r) => r.revokedAt === null,
+		);
+		expect(active).toHaveLength(1);
 	});
 });
 
@@ -304,4 +312,22 @@ describe("Refresh token storage", () => {
 		expect(diffDays).toBeGreaterThan(6.9);
 		expect(diffDays).toBeLessThan(7.1);
 	});
+
+	it("expires rotated and revoked tokens so the sweep can remove them", async () => {
+		const { app, db } = await setupTestApp();
+		const rotated = await loginAndGetTokens(app);
+		await postRefresh(app, { refresh_token: rotated.refresh_token });
+		const revoked = await loginAndGetTokens(app);
+		await postRevoke(app, { refresh_token: revoked.refresh_token });
+
+		const now = new Date().toISOString();
+		for (const token of [rotated.refresh_token, revoked.refresh_token]) {
+			const [row] = await db
+				.select()
+				.from(refreshTokens)
+				.where(eq(refreshTokens.token, token));
+			expect(row.revokedAt).not.toBeNull();
+			expect(row.expiresAt <= now).toBe(true);
+		}
+	});
 });
@@ -0,0 +1,60 @@
+import { afterEach, describe, expect, it, vi } from "vitest";
+import { signJwt, verifyJwt } from "../auth/crypto";
+import { getDatabase } from "../db/client";
+import { app } from "../index";
+
+afterEach(() => {
+	vi.restoreAllMocks();
+});
+
+describe("getDatabase", () => {
+	it("returns the same handle for the same binding set", () => {
+		const a = getDatabase({ url: "file::memory:" });
+		const b = getDatabase({ url: "file::memory:" });
+		expect(a).toBe(b);
+	});
+
+	it("returns distinct handles for different binding sets", () => {
+		const a = getDatabase({ url: "file::memory:" });
+		const b = getDatabase({ url: "file::memory:", authToken: "other" });
+		expect(a).not.toBe(b);
+	});
+});
+
+describe("HMAC key cache", () => {
+	it("imports the JWT secret once across sign and verify", async () => {
+		const importKey = vi.spyOn(crypto.subtle, "importKey");
+		const secret = "registry-test-secret";
+
+		const token = await signJwt({ sub: "1" }, secret);
+		await verifyJwt(token, secret);
+		await signJwt({ sub: "2" }, secret);
+
+		const hmacImports = importKey.mock.calls.filter(
+			([, , algorithm]) => (algorithm as { name?: string }).name === "HMAC",
+		);
+		expect(hmacImports).toHaveLength(1);
+	});
+
+	it("still rejects tokens signed with a different secret", async () => {
+		const token = await signJwt({ sub: "1" }, "secret-a");
+		expect(await verifyJwt(token, "secret-b")).toBeNull();
+		expect(await verifyJwt(token, "secret-a")).not.toBeNull();
+	});
+});
+
+describe("static asset route", () => {
+	it("does not open a database connection", async () => {
+		const assets = { fetch: async () => new Response("<html></html>") };
+
+		// An unusable URL would throw if the asset path tried to build a client
+		const res = await app.request(
+			"/dashboard",
+			{},
+			{ TURSO_DATABASE_URL: "unsupported://nowhere", ASSETS: assets },
+		);
+
+		expect(res.status).toBe(200);
+		expect(await res.text()).toBe("<html></html>");
+	});
+});
@@ -197,6 +197,92 @@ describe("POST /roles/:roleId/permissions", () => {
 	});
 });
 
+describe("POST /roles/permissions/bulk", () => {
+	async function createRole(name: string): Promise<number> {
+		const res = await rolesRequest("", { name });
+		return ((await res.json()) as { id: number }).id;
+	}
+
+	async function listRoles() {
+		const res = await testApp.request(
+			"/roles",
+			{ method: "GET", headers: { Authorization: `Bearer ${validToken}` } },
+			{ JWT_SECRET: TEST_JWT_SECRET },
+		);
+		return (await res.json()) as Array<{ id: number; permissions: string[] }>;
+	}
+
+	it("assigns permissions across roles in one request, creating new ones", async () => {
+		const editor = await createRole("editor");
+		const viewer = await createRole("viewer");
+
+		const res = await rolesRequest("/permissions/bulk", {
+			assign: [
+				{ roleId: editor, permission: "posts:read" },
+				{ roleId: editor, permission: "posts:write" },
+				{ roleId: viewer, permission: "posts:read" },
+				{ roleId: viewer, permission: "posts:read" },
+			],
+		});
+
+		expect(res.status).toBe(200);
+		expect(await res.json()).toEqual({ assigned: 3, revoked: 0 });
+		const roles = await listRoles();
+		expect(roles.find((r) => r.id === editor)?.permissions.sort()).toEqual([
+			"posts:read",
+			"posts:write",
+		]);
+		expect(roles.find((r) => r.id === viewer)?.permissions).toEqual([
+			"posts:read",
+		]);
+	});
+
+	it("revokes and assigns in the same request", async () => {
+		const editor = await createRole("editor");
+		await rolesRequest(`/${editor}/permissions`, { permission: "posts:read" });
+
+		const res = await rolesRequest("/permissions/bulk", {
+			assign: [{ roleId: editor, permission: "posts:write" }],
+			revoke: [{ roleId: editor, permission: "posts:read" }],
+		});
+
+		expect(await res.json()).toEqual({ assigned: 1, revoked: 1 });
+		const roles = await listRoles();
+		expect(roles.find((r) => r.id === editor)?.permissions).toEqual([
+			"posts:write",
+		]);
+	});
+
+	it("returns 404 listing unknown roles and changes nothing", async () => {
+		const editor = await createRole("editor");
+
+		const res = await rolesRequest("/permissions/bulk", {
+			assign: [
+				{ roleId: editor, permission: "posts:read" },
+				{ roleId: 9999, permission: "posts:read" },
+			],
+		});
+
+		expect(res.status).toBe(404);
+		expect(await res.json()).toEqual({
+			error: "Role not found",
+			roleIds: [9999],
+		});
+		const roles = await listRoles();
+		expect(roles.find((r) => r.id === editor)?.permissions).toEqual([]);
+	});
+
+	it("returns 400 for malformed entries", async () => {
+		const res = await rolesRequest("/permissions/bulk", {
+			assign: [{ roleId: "1", permission: "posts:read" }],
+		});
+		expect(res.status).toBe(400);
+
+		const empty = await rolesRequest("/permissions/bulk", {});
+		expect(empty.status).toBe(400);
+	});
+});
+
 describe("PUT /roles/:roleId", () => {
 	it("returns 200 and updates the role name", async () => {
 		const createRes = await rolesRequest("", {
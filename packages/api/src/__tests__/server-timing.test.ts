@@ -0,0 +1,110 @@
+import { Hono } from "hono";
+import { afterEach, describe, expect, it, vi } from "vitest";
+import { signJwt } from "../auth/crypto";
+import { type Database, createDatabase } from "../db/client";
+import { app } from "../index";
+import {
+	type TimingLogEntry,
+	formatServerTiming,
+	serverTiming,
+} from "../middleware/server-timing";
+import { timed } from "../timing";
+
+afterEach(() => {
+	vi.restoreAllMocks();
+});
+
+function buildApp(enabled: boolean, entries: TimingLogEntry[]) {
+	const db = createDatabase({ url: "file::memory:" });
+	const testApp = new Hono<{ Variables: { db: Database } }>();
+	testApp.use(
+		"*",
+		serverTiming({ enabled: () => enabled, log: (e) => entries.push(e) }),
+	);
+	testApp.get("/work", async (c) => {
+		await db.run("SELECT 1");
+		await db.run("SELECT 2");
+		const token = await signJwt({ sub: "1" }, "timing-secret");
+		return c.json({ token });
+	});
+	return testApp;
+}
+
+describe("serverTiming", () => {
+	it("splits DB, crypto and handler time into a Server-Timing header", async () => {
+		const entries: TimingLogEntry[] = [];
+		const res = await buildApp(true, entries).request("/work");
+
+		expect(res.status).toBe(200);
+		const header = res.headers.get("Server-Timing") ?? "";
+		expect(header).toMatch(/db;dur=[\d.]+;desc="2 queries"/);
+		expect(header).toMatch(/crypto;dur=[\d.]+;desc="1 ops"/);
+		expect(header).toMatch(/handler;dur=[\d.]+/);
+		expect(header).toMatch(/total;dur=[\d.]+/);
+	});
+
+	it("logs one structured entry per request", async () => {
+		const entries: TimingLogEntry[] = [];
+		await buildApp(true, entries).request("/work");
+
+		expect(entries).toHaveLength(1);
+		expect(entries[0]).toMatchObject({
+			type: "server_timing",
+			method: "GET",
+			path: "/work",
+			status: 200,
+			dbCalls: 2,
+			cryptoCalls: 1,
+		});
+		expect(entries[0].total).toBeGreaterThanOrEqual(entries[0].db);
+	});
+
+	it("does nothing when switched off", async () => {
+		const entries: TimingLogEntry[] = [];
+		const res = await buildApp(false, entries).request("/work");
+
+		expect(res.headers.get("Server-Timing")).toBeNull();
+		expect(entries).toHaveLength(0);
+	});
+
+	it("is enabled on the worker by the SERVER_TIMING variable", async () => {
+		const log = vi.spyOn(console, "log").mockImplementation(() => {});
+
+		const on = await app.request(
+			"/health",
+			{},
+			{ TURSO_DATABASE_URL: "file::memory:", SERVER_TIMING: "1" },
+		);
+		const off = await app.request(
+			"/health",
+			{},
+			{ TURSO_DATABASE_URL: "file::memory:" },
+		);
+
+		expect(on.headers.get("Server-Timing")).toContain('desc="1 queries"');
+		expect(off.headers.get("Server-Timing")).toBeNull();
+		expect(log).toHaveBeenCalledTimes(1);
+		expect(JSON.parse(log.mock.calls[0][0] as string).path).toBe("/health");
+	});
+});
+
+describe("timed", () => {
+	it("runs the callback untimed outside a request", async () => {
+		expect(await timed("db", async () => 42)).toBe(42);
+	});
+
+	it("formats durations to two decimal places", () => {
+		expect(
+			formatServerTiming({
+				total: 12.3456,
+				db: 4.001,
+				crypto: 0,
+				handler: 8.3446,
+				dbCalls: 3,
+				cryptoCalls: 0,
+			}),
+		).toBe(
+			'db;dur=4;desc="3 queries", crypto;dur=0;desc="0 ops", handler;dur=8.34, total;dur=12.35',
+		);
+	});
+});
@@ -0,0 +1,117 @@
+import { beforeEach, describe, expect, it } from "vitest";
+import { cleanupExpiredTokens } from "../auth/token-cleanup";
+import { type Database, createDatabase } from "../db/client";
+import { passwordResetTokens, refreshTokens } from "../db/schema";
+
+const CREATE_TABLES = `
+	CREATE TABLE refresh_tokens (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		token TEXT NOT NULL UNIQUE,
+		user_id INTEGER NOT NULL,
+		expires_at TEXT NOT NULL,
+		revoked_at TEXT,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE password_reset_tokens (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		token TEXT NOT NULL UNIQUE,
+		user_id INTEGER NOT NULL,
+		expires_at TEXT NOT NULL,
+		used_at TEXT,
+		created_at TEXT NOT NULL
+	);
+`;
+
+const PAST = "2020-01-01T00:00:00.000Z";
+const FUTURE = "2099-01-01T00:00:00.000Z";
+
+let db: Database;
+
+beforeEach(async () => {
+	db = createDatabase({ url: "file::memory:" });
+	for (const stmt of CREATE_TABLES.split(";").filter((s) => s.trim())) {
+		await db.run(stmt);
+	}
+});
+
+describe("cleanupExpiredTokens", () => {
+	it("removes revoked and expired refresh tokens and keeps active ones", async () => {
+		// Revocation expires the token at the same time
+		await db.insert(refreshTokens).values([
+			{ token: "active", userId: 1, expiresAt: FUTURE },
+			{ token: "revoked", userId: 1, expiresAt: PAST, revokedAt: PAST },
+			{ token: "expired", userId: 2, expiresAt: PAST },
+		]);
+
+		const result = await cleanupExpiredTokens(db);
+
+		expect(result.refreshTokens).toBe(2);
+		const remaining = await db.select().from(refreshTokens).all();
+		expect(remaining.map((r) => r.token)).toEqual(["active"]);
+	});
+
+	it("removes used and expired password reset tokens and keeps pending ones", async () => {
+		await db.insert(passwordResetTokens).values([
+			{ token: "pending", userId: 1, expiresAt: FUTURE },
+			{ token: "used", userId: 1, expiresAt: PAST, usedAt: PAST },
+			{ token: "expired", userId: 1, expiresAt: PAST },
+		]);
+
+		const result = await cleanupExpiredTokens(db);
+
+		expect(result.passwordResetTokens).toBe(2);
+		const remaining = await db.select().from(passwordResetTokens).all();
+		expect(remaining.map((r) => r.token)).toEqual(["pending"]);
+	});
+
+	it("deletes in bounded chunks", async () => {
+		await db.insert(refreshTokens).values(
+			Array.from({ length: 25 }, (_, i) => ({
+				token: `expired-${i}`,
+				userId: 1,
+				expiresAt: PAST,
+			})),
+		);
+
+		const partial = await cleanupExpiredTokens(db, {
+			batchSize: 10,
+			maxBatches: 2,
+		});
+		expect(partial.refreshTokens).toBe(20);
+		expect(await db.select().from(refreshTokens).all()).toHaveLength(5);
+
+		const rest = await cleanupExpiredTokens(db, { batchSize: 10 });
+		expect(rest.refreshTokens).toBe(5);
+		expect(await db.select().from(refreshTokens).all()).toHaveLength(0);
+	});
+
+	it("stops once the time budget is spent", async () => {
+		await db
+			.insert(refreshTokens)
+			.values({ token: "expired", userId: 1, expiresAt: PAST });
+
+		const result = await cleanupExpiredTokens(db, { timeBudgetMs: 0 });
+
+		expect(result.refreshTokens).toBe(0);
+		expect(await db.select().from(refreshTokens).all()).toHaveLength(1);
+	});
+
+	it("finds expired tokens through the expires_at indexes", async () => {
+		for (const table of ["refresh_tokens", "password_reset_tokens"]) {
+			await db.run(
+				`CREATE INDEX ${table}_expires_at_idx ON ${table} (expires_at)`,
+			);
+			// Same statement shape as cleanupExpiredTokens
+			const plan = await db.$client.execute({
+				sql: `EXPLAIN QUERY PLAN DELETE FROM ${table} WHERE id IN (
+					SELECT id FROM ${table} WHERE expires_at < ? LIMIT ?
+				)`,
+				args: [PAST, 500],
+			});
+
+			expect(plan.rows.map((row) => String(row.detail)).join("\n")).toMatch(
+				`SEARCH ${table} USING COVERING INDEX ${table}_expires_at_idx (expires_at<?)`,
+			);
+		}
+	});
+});
@@ -291,6 +291,88 @@ describe("DELETE /users/:userId/roles/:roleId", () => {
 	});
 });
 
+describe("POST /users/roles/bulk", () => {
+	function postBulk(body: unknown) {
+		return testApp.request(
+			"/users/roles/bulk",
+			{
+				method: "POST",
+				headers: {
+					"Content-Type": "application/json",
+					Authorization: `Bearer ${validToken}`,
+				},
+				body: JSON.stringify(body),
+			},
+			{ JWT_SECRET: TEST_JWT_SECRET },
+		);
+	}
+
+	it("assigns roles to many users in one request", async () => {
+		const alice = await createUser("alice@example.com");
+		const bob = await createUser("bob@example.com");
+		const roleId = await createRoleWithPermissions("reader", ["posts:read"]);
+
+		const res = await postBulk({
+			assign: [
+				{ userId: alice, roleId },
+				{ userId: bob, roleId },
+				{ userId: bob, roleId },
+			],
+		});
+
+		expect(res.status).toBe(200);
+		expect(await res.json()).toEqual({ assigned: 2, revoked: 0 });
+		for (const userId of [alice, bob]) {
+			const body = (await (await getUserPermissions(userId)).json()) as {
+				permissions: string[];
+			};
+			expect(body.permissions).toEqual(["posts:read"]);
+		}
+	});
+
+	it("revokes roles", async () => {
+		const userId = await createUser();
+		const reader = await createRoleWithPermissions("reader", ["posts:read"]);
+		const writer = await createRoleWithPermissions("writer", ["posts:write"]);
+		await postBulk({
+			assign: [
+				{ userId, roleId: reader },
+				{ userId, roleId: writer },
+			],
+		});
+
+		const res = await postBulk({ revoke: [{ userId, roleId: reader }] });
+
+		expect(await res.json()).toEqual({ assigned: 0, revoked: 1 });
+		const body = (await (await getUserPermissions(userId)).json()) as {
+			permissions: string[];
+			roles: Array<{ id: number; name: string }>;
+		};
+		expect(body.permissions).toEqual(["posts:write"]);
+		expect(body.roles).toEqual([{ id: writer, name: "writer" }]);
+	});
+
+	it("returns 404 listing unknown users", async () => {
+		const roleId = await createRoleWithPermissions("reader", []);
+
+		const res = await postBulk({ assign: [{ userId: 9999, roleId }] });
+
+		expect(res.status).toBe(404);
+		expect(await res.json()).toEqual({
+			error: "User not found",
+			userIds: [9999],
+		});
+	});
+
+	it("returns 400 when a request has too many changes", async () => {
+		const userId = await createUser();
+		const res = await postBulk({
+			assign: Array.from({ length: 1001 }, () => ({ userId, roleId: 1 })),
+		});
+		expect(res.status).toBe(400);
+	});
+});
+
 describe("Auth middleware on /users", () => {
 	it("returns 401 for GET /users without Authorization header", async () => {
 		const res = await testApp.request(
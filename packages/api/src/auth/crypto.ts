@@ -1,3 +1,5 @@
+import { timed } from "../timing";
+
 export function hexEncode(buffer: ArrayBuffer): string {
 	return Array.from(new Uint8Array(buffer))
 		.map((b) => b.toString(16).padStart(2, "0"))
@@ -37,6 +39,18 @@ function base64UrlDecode(str: string): Uint8Array {
 	return bytes;
 }
 
+// The expensive WebCrypto calls, charged to the request's crypto time
+const timedSubtle = {
+	deriveBits: (...args: Parameters<SubtleCrypto["deriveBits"]>) =>
+		timed("crypto", () => crypto.subtle.deriveBits(...args)),
+	sign: (...args: Parameters<SubtleCrypto["sign"]>) =>
+		timed("crypto", () => crypto.subtle.sign(...args)),
+	verify: (...args: Parameters<SubtleCrypto["verify"]>) =>
+		timed("crypto", () => crypto.subtle.verify(...args)),
+	digest: (...args: Parameters<SubtleCrypto["digest"]>) =>
+		timed("crypto", () => crypto.subtle.digest(...args)),
+};
+
 const PBKDF2_ITERATIONS = 100000;
 const SALT_LENGTH = 16;
 
@@ -49,7 +63,7 @@ export async function hashPassword(password: string): Promise<string> {
 		false,
 		["deriveBits"],
 	);
-	const derived = await crypto.subtle.deriveBits(
+	const derived = await timedSubtle.deriveBits(
 		{
 			name: "PBKDF2",
 			salt,
@@ -75,7 +89,7 @@ export async function verifyPassword(
 		false,
 		["deriveBits"],
 	);
-	const derived = await crypto.subtle.deriveBits(
+	const derived = await timedSubtle.deriveBits(
 		{
 			name: "PBKDF2",
 			salt,
@@ -88,6 +102,25 @@ export async function verifyPassword(
 	return hexEncode(derived) === hashHex;
 }
 
+// Imported HMAC keys are cached per isolate, keyed by secret
+const hmacKeys = new Map<string, Promise<CryptoKey>>();
+
+function getHmacKey(secret: string): Promise<CryptoKey> {
+	let key = hmacKeys.get(secret);
+	if (!key) {
+		key = crypto.subtle.importKey(
+			"raw",
+			new TextEncoder().encode(secret),
+			{ name: "HMAC", hash: "SHA-256" },
+			false,
+			["sign", "verify"],
+		);
+		key.catch(() => hmacKeys.delete(secret));
+		hmacKeys.set(secret, key);
+	}
+	return key;
+}
+
 export async function signJwt(
 	payload: { sub: string; [key: string]: unknown },
 	secret: string,
@@ -103,14 +136,8 @@ export async function signJwt(
 	const body = base64UrlEncode(JSON.stringify(claims));
 	const signingInput = `${header}.${body}`;
 
-	const key = await crypto.subtle.importKey(
-		"raw",
-		new TextEncoder().encode(secret),
-		{ name: "HMAC", hash: "SHA-256" },
-		false,
-		["sign"],
-	);
-	const signature = await crypto.subtle.sign(
+	const key = await getHmacKey(secret);
+	const signature = await timedSubtle.sign(
 		"HMAC",
 		key,
 		new TextEncoder().encode(signingInput),
@@ -131,7 +158,7 @@ export function generateApiKey(): string {
 
 export async function hashApiKey(key: string): Promise<string> {
 	const data = new TextEncoder().encode(key);
-	const hash = await crypto.subtle.digest("SHA-256", data);
+	const hash = await timedSubtle.digest("SHA-256", data);
 	return hexEncode(hash);
 }
 
@@ -145,16 +172,10 @@ export async function verifyJwt(
 	const [header, body, sig] = parts;
 	const signingInput = `${header}.${body}`;
 
-	const key = await crypto.subtle.importKey(
-		"raw",
-		new TextEncoder().encode(secret),
-		{ name: "HMAC", hash: "SHA-256" },
-		false,
-		["verify"],
-	);
+	const key = await getHmacKey(secret);
 
 	const signatureBytes = base64UrlDecode(sig);
-	const valid = await crypto.subtle.verify(
+	const valid = await timedSubtle.verify(
 		"HMAC",
 		key,
 		signatureBytes,
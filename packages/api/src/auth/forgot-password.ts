@@ -2,7 +2,7 @@ import { eq } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { passwordResetTokens, users } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 import { generateRefreshToken } from "./crypto";
 
 type Bindings = {
@@ -36,7 +36,7 @@ forgotPassword.post("/", async (c) => {
 		.where(eq(users.email, email));
 
 	if (!user) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "password_reset_requested",
 			userId: null,
 			ipAddress: getClientIp(c),
@@ -53,7 +53,7 @@ forgotPassword.post("/", async (c) => {
 		expiresAt,
 	});
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "password_reset_requested",
 		userId: String(user.id),
 		ipAddress: getClientIp(c),
@@ -2,7 +2,7 @@ import { eq } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { refreshTokens, users } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 import { generateRefreshToken, signJwt, verifyPassword } from "./crypto";
 
 type Bindings = {
@@ -30,7 +30,7 @@ login.post("/", async (c) => {
 	const [user] = await db.select().from(users).where(eq(users.email, email));
 
 	if (!user) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "login_failed",
 			userId: null,
 			ipAddress: getClientIp(c),
@@ -41,7 +41,7 @@ login.post("/", async (c) => {
 
 	const valid = await verifyPassword(password, user.hashedPassword);
 	if (!valid) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "login_failed",
 			userId: null,
 			ipAddress: getClientIp(c),
@@ -60,7 +60,7 @@ login.post("/", async (c) => {
 		expiresAt,
 	});
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "login",
 		userId: String(user.id),
 		ipAddress: getClientIp(c),
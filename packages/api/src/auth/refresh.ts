@@ -1,8 +1,8 @@
-import { and, eq, isNotNull, lt, or } from "drizzle-orm";
+import { and, eq, gte, isNull, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { refreshTokens } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 import { generateRefreshToken, signJwt } from "./crypto";
 
 type Bindings = {
@@ -27,54 +27,54 @@ refresh.post("/", async (c) => {
 	}
 
 	const db = c.get("db");
-	const [row] = await db
-		.select()
-		.from(refreshTokens)
-		.where(eq(refreshTokens.token, refresh_token));
-
-	if (!row) {
-		return c.json({ error: "Invalid refresh token" }, 401);
-	}
-
-	if (row.revokedAt !== null) {
-		return c.json({ error: "Refresh token revoked" }, 401);
-	}
-
-	if (row.expiresAt < new Date().toISOString()) {
-		return c.json({ error: "Refresh token expired" }, 401);
-	}
-
-	// Revoke the old refresh token
-	await db
-		.update(refreshTokens)
-		.set({ revokedAt: new Date().toISOString() })
-		.where(eq(refreshTokens.token, refresh_token));
-
-	// Generate and store a new refresh token
+	const now = new Date().toISOString();
 	const newRefreshToken = generateRefreshToken();
 	const expiresAt = new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString();
-	await db.insert(refreshTokens).values({
-		token: newRefreshToken,
-		userId: row.userId,
-		expiresAt,
-	});
 
-	// Eager cleanup: remove all revoked or expired tokens for this user
-	await db
-		.delete(refreshTokens)
-		.where(
-			and(
-				eq(refreshTokens.userId, row.userId),
-				or(
-					isNotNull(refreshTokens.revokedAt),
-					lt(refreshTokens.expiresAt, new Date().toISOString()),
+	// Revoke the old token and issue its replacement in one round-trip. The
+	// insert only fires when the conditional update claimed the old token, so
+	// concurrent refreshes with the same token can't both rotate it.
+	const [claimed] = await db.batch([
+		db
+			.update(refreshTokens)
+			// Expiring it too lets the scheduled sweep reach it by expires_at
+			.set({ revokedAt: now, expiresAt: now })
+			.where(
+				and(
+					eq(refreshTokens.token, refresh_token),
+					isNull(refreshTokens.revokedAt),
+					gte(refreshTokens.expiresAt, now),
 				),
-			),
-		);
+			)
+			.returning({ userId: refreshTokens.userId }),
+		db.run(sql`
+			INSERT INTO refresh_tokens (token, user_id, expires_at, created_at)
+			SELECT ${newRefreshToken}, user_id, ${expiresAt}, ${now}
+			FROM refresh_tokens
+			WHERE token = ${refresh_token} AND changes() = 1
+		`),
+	]);
+
+	const row = claimed[0];
+	if (!row) {
+		// Slow path: look the token up only to report why it was rejected
+		const [existing] = await db
+			.select()
+			.from(refreshTokens)
+			.where(eq(refreshTokens.token, refresh_token));
+
+		if (!existing) {
+			return c.json({ error: "Invalid refresh token" }, 401);
+		}
+		if (existing.revokedAt !== null) {
+			return c.json({ error: "Refresh token revoked" }, 401);
+		}
+		return c.json({ error: "Refresh token expired" }, 401);
+	}
 
 	const token = await signJwt({ sub: String(row.userId) }, c.env.JWT_SECRET);
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "refresh",
 		userId: String(row.userId),
 		ipAddress: getClientIp(c),
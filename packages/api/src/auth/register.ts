@@ -1,7 +1,7 @@
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { users } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 import { hashPassword } from "./crypto";
 
 type Bindings = {
@@ -32,7 +32,7 @@ register.post("/", async (c) => {
 		});
 
 		const id = Number(result.lastInsertRowid);
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "register",
 			userId: String(id),
 			ipAddress: getClientIp(c),
@@ -2,7 +2,7 @@ import { eq } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { passwordResetTokens, users } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 import { hashPassword } from "./crypto";
 
 type Bindings = {
@@ -36,7 +36,7 @@ resetPassword.post("/", async (c) => {
 		.where(eq(passwordResetTokens.token, token));
 
 	if (!row) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "password_reset_failed",
 			userId: null,
 			ipAddress: getClientIp(c),
@@ -46,7 +46,7 @@ resetPassword.post("/", async (c) => {
 	}
 
 	if (row.usedAt !== null) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "password_reset_failed",
 			userId: String(row.userId),
 			ipAddress: getClientIp(c),
@@ -56,7 +56,7 @@ resetPassword.post("/", async (c) => {
 	}
 
 	if (row.expiresAt < new Date().toISOString()) {
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "password_reset_failed",
 			userId: String(row.userId),
 			ipAddress: getClientIp(c),
@@ -71,12 +71,14 @@ resetPassword.post("/", async (c) => {
 		.set({ hashedPassword, updatedAt: new Date().toISOString() })
 		.where(eq(users.id, row.userId));
 
+	// Expiring the token too lets the scheduled sweep reach it by expires_at
+	const usedAt = new Date().toISOString();
 	await db
 		.update(passwordResetTokens)
-		.set({ usedAt: new Date().toISOString() })
+		.set({ usedAt, expiresAt: usedAt })
 		.where(eq(passwordResetTokens.token, token));
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "password_reset_completed",
 		userId: String(row.userId),
 		ipAddress: getClientIp(c),
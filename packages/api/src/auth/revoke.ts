@@ -1,8 +1,8 @@
-import { eq } from "drizzle-orm";
+import { eq, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { refreshTokens } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 
 type Bindings = {
 	TURSO_DATABASE_URL: string;
@@ -26,21 +26,23 @@ revoke.post("/", async (c) => {
 	}
 
 	const db = c.get("db");
+	// Keep the original revocation time if the token was already revoked, and
+	// expire the token so the scheduled sweep reaches it by expires_at
+	const now = new Date().toISOString();
 	const [row] = await db
-		.select()
-		.from(refreshTokens)
-		.where(eq(refreshTokens.token, refresh_token));
+		.update(refreshTokens)
+		.set({
+			revokedAt: sql`coalesce(${refreshTokens.revokedAt}, ${now})`,
+			expiresAt: sql`min(${refreshTokens.expiresAt}, ${now})`,
+		})
+		.where(eq(refreshTokens.token, refresh_token))
+		.returning({ userId: refreshTokens.userId });
 
 	if (!row) {
 		return c.json({ error: "Invalid refresh token" }, 401);
 	}
 
-	await db
-		.update(refreshTokens)
-		.set({ revokedAt: new Date().toISOString() })
-		.where(eq(refreshTokens.token, refresh_token));
-
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "revoke",
 		userId: String(row.userId),
 		ipAddress: getClientIp(c),
@@ -0,0 +1,74 @@
+import { type SQL, sql } from "drizzle-orm";
+import type { Database } from "../db/client";
+
+export interface TokenCleanupOptions {
+	batchSize?: number;
+	maxBatches?: number;
+	timeBudgetMs?: number;
+	now?: Date;
+}
+
+export interface TokenCleanupResult {
+	refreshTokens: number;
+	passwordResetTokens: number;
+}
+
+/**
+ * Deletes expired refresh and password reset tokens in bounded chunks, so a
+ * large backlog never turns into one long write transaction. Revoked and used
+ * tokens are expired when they are revoked or used, so one indexed
+ * `expires_at` range covers them too. Runs from the scheduled handler until
+ * both tables are clear, `maxBatches` chunks per table have run or
+ * `timeBudgetMs` has elapsed.
+ */
+export async function cleanupExpiredTokens(
+	db: Database,
+	options: TokenCleanupOptions = {},
+): Promise<TokenCleanupResult> {
+	const batchSize = options.batchSize ?? 500;
+	const maxBatches = options.maxBatches ?? 100;
+	const deadline = Date.now() + (options.timeBudgetMs ?? 25_000);
+	const now = (options.now ?? new Date()).toISOString();
+
+	const refreshTokens = await deleteInChunks(
+		db,
+		(limit) => sql`
+			DELETE FROM refresh_tokens WHERE id IN (
+				SELECT id FROM refresh_tokens WHERE expires_at < ${now} LIMIT ${limit}
+			)
+		`,
+		batchSize,
+		maxBatches,
+		deadline,
+	);
+
+	const passwordResetTokens = await deleteInChunks(
+		db,
+		(limit) => sql`
+			DELETE FROM password_reset_tokens WHERE id IN (
+				SELECT id FROM password_reset_tokens WHERE expires_at < ${now} LIMIT ${limit}
+			)
+		`,
+		batchSize,
+		maxBatches,
+		deadline,
+	);
+
+	return { refreshTokens, passwordResetTokens };
+}
+
+async function deleteInChunks(
+	db: Database,
+	statement: (limit: number) => SQL,
+	batchSize: number,
+	maxBatches: number,
+	deadline: number,
+): Promise<number> {
+	let total = 0;
+	for (let i = 0; i < maxBatches && Date.now() < deadline; i++) {
+		const result = await db.run(statement(batchSize));
+		total += result.rowsAffected;
+		if (result.rowsAffected < batchSize) break;
+	}
+	return total;
+}
@@ -0,0 +1,274 @@
+import { mkdtemp, rm, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { afterAll, beforeAll, describe, expect, it, vi } from "vitest";
+import { getDatabase } from "../db/client";
+import { auditLogs } from "../db/schema";
+import { app } from "../index";
+import { type LoadResult, formatLoadResults, runLoad } from "./load";
+
+// Mirrors src/db/schema.ts, indexes included, as drizzle-kit push would create it
+const SCHEMA = `
+	CREATE TABLE users (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		email TEXT NOT NULL UNIQUE,
+		hashed_password TEXT NOT NULL,
+		created_at TEXT NOT NULL,
+		updated_at TEXT NOT NULL
+	);
+	CREATE TABLE refresh_tokens (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		token TEXT NOT NULL UNIQUE,
+		user_id INTEGER NOT NULL,
+		expires_at TEXT NOT NULL,
+		revoked_at TEXT,
+		created_at TEXT NOT NULL
+	);
+	CREATE INDEX refresh_tokens_expires_at_idx ON refresh_tokens (expires_at);
+	CREATE TABLE roles (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		name TEXT NOT NULL UNIQUE,
+		description TEXT,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE permissions (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		permission TEXT NOT NULL UNIQUE,
+		created_at TEXT NOT NULL
+	);
+	CREATE TABLE role_permissions (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		role_id INTEGER NOT NULL,
+		permission_id INTEGER NOT NULL,
+		created_at TEXT NOT NULL
+	);
+	CREATE UNIQUE INDEX role_permissions_role_id_permission_id_idx
+		ON role_permissions (role_id, permission_id);
+	CREATE TABLE user_roles (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		role_id INTEGER NOT NULL,
+		created_at TEXT NOT NULL
+	);
+	CREATE UNIQUE INDEX user_roles_user_id_role_id_idx ON user_roles (user_id, role_id);
+	CREATE INDEX user_roles_role_id_idx ON user_roles (role_id);
+	CREATE TABLE password_reset_tokens (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		token TEXT NOT NULL UNIQUE,
+		user_id INTEGER NOT NULL,
+		expires_at TEXT NOT NULL,
+		used_at TEXT,
+		created_at TEXT NOT NULL
+	);
+	CREATE INDEX password_reset_tokens_expires_at_idx
+		ON password_reset_tokens (expires_at);
+	CREATE TABLE api_keys (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		name TEXT NOT NULL,
+		key_hash TEXT NOT NULL UNIQUE,
+		key_prefix TEXT NOT NULL,
+		created_at TEXT NOT NULL,
+		revoked_at TEXT,
+		last_used_at TEXT
+	);
+	CREATE TABLE audit_logs (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		event_type TEXT NOT NULL,
+		user_id TEXT,
+		ip_address TEXT NOT NULL,
+		timestamp TEXT NOT NULL,
+		metadata TEXT
+	);
+	CREATE INDEX audit_logs_timestamp_id_idx ON audit_logs (timestamp, id);
+	CREATE INDEX audit_logs_event_type_timestamp_id_idx
+		ON audit_logs (event_type, timestamp, id);
+	CREATE INDEX audit_logs_user_id_timestamp_id_idx
+		ON audit_logs (user_id, timestamp, id);
+`;
+
+const REQUESTS = Number(process.env.LOAD_REQUESTS) || 200;
+const CONCURRENCY = Number(process.env.LOAD_CONCURRENCY) || 8;
+const AUDIT_ROWS = 5000;
+const EMAIL = "load@example.com";
+const PASSWORD = "load-test-password";
+
+let dir: string;
+let env: Record<string, string>;
+let accessToken: string;
+let apiKey: string;
+let auditCursor: string;
+const refreshTokens: string[] = [];
+const results: LoadResult[] = [];
+
+// Each request gets its own client IP so the auth rate limits never trip
+let clientCount = 0;
+function nextIp() {
+	clientCount += 1;
+	return `10.${(clientCount >> 16) & 255}.${(clientCount >> 8) & 255}.${clientCount & 255}`;
+}
+
+function send(path: string, init: RequestInit = {}) {
+	const headers = new Headers(init.headers);
+	headers.set("CF-Connecting-IP", nextIp());
+	return app.request(path, { ...init, headers }, env);
+}
+
+function postJson(path: string, body: unknown, headers: HeadersInit = {}) {
+	return send(path, {
+		method: "POST",
+		headers: { "Content-Type": "application/json", ...headers },
+		body: JSON.stringify(body),
+	});
+}
+
+async function login() {
+	const res = await postJson("/login", { email: EMAIL, password: PASSWORD });
+	return (await res.json()) as { access_token: string; refresh_token: string };
+}
+
+describe.skipIf(!process.env.LOAD_TEST)("API load", () => {
+	beforeAll(async () => {
+		dir = await mkdtemp(join(tmpdir(), "cerberus-load-"));
+		const url = `file:${join(dir, "load.db")}`;
+		env = {
+			TURSO_DATABASE_URL: url,
+			JWT_SECRET: "load-test-secret",
+			ADMIN_SETUP_TOKEN: "load-test-setup-token",
+			// On by default so results include the DB / crypto / handler split
+			SERVER_TIMING: process.env.SERVER_TIMING ?? "1",
+		};
+		// Timing log lines would drown the report
+		vi.spyOn(console, "log").mockImplementation(() => {});
+
+		const db = getDatabase({ url });
+		for (const stmt of SCHEMA.split(";").filter((s) => s.trim())) {
+			await db.run(stmt);
+		}
+
+		const registered = await postJson("/register", {
+			email: EMAIL,
+			password: PASSWORD,
+		});
+		const { id } = (await registered.json()) as { id: number };
+		await postJson(
+			"/seed",
+			{ userId: id },
+			{ "X-Setup-Token": env.ADMIN_SETUP_TOKEN },
+		);
+
+		accessToken = (await login()).access_token;
+		for (let i = 0; i < CONCURRENCY; i++) {
+			refreshTokens.push((await login()).refresh_token);
+		}
+
+		const created = await postJson(
+			"/api-keys",
+			{ name: "load-test" },
+			{ Authorization: `Bearer ${accessToken}` },
+		);
+		apiKey = ((await created.json()) as { key: string }).key;
+
+		const start = Date.UTC(2024, 0, 1);
+		for (let offset = 0; offset < AUDIT_ROWS; offset += 500) {
+			await db.insert(auditLogs).values(
+				Array.from({ length: 500 }, (_, i) => ({
+					eventType: i % 3 === 0 ? "login" : "refresh",
+					userId: String(id),
+					ipAddress: "127.0.0.1",
+					timestamp: new Date(start + (offset + i) * 1000).toISOString(),
+				})),
+			);
+		}
+		const firstPage = await send("/audit-logs?limit=50", {
+			headers: { Authorization: `Bearer ${accessToken}` },
+		});
+		auditCursor = (
+			(await firstPage.json()) as { pagination: { next_cursor: string } }
+		).pagination.next_cursor;
+	}, 120_000);
+
+	afterAll(async () => {
+		vi.restoreAllMocks();
+		if (results.length > 0) {
+			console.info(`\n${formatLoadResults(results)}\n`);
+			if (process.env.LOAD_OUTPUT) {
+				await writeFile(
+					process.env.LOAD_OUTPUT,
+					JSON.stringify(results, null, 2),
+				);
+			}
+		}
+		await rm(dir, { recursive: true, force: true });
+	});
+
+	async function measure(
+		scenario: string,
+		sendOne: (worker: number) => Promise<Response>,
+		requests = REQUESTS,
+	) {
+		const result = await runLoad(scenario, sendOne, {
+			requests,
+			concurrency: CONCURRENCY,
+			warmup: 5,
+		});
+		results.push(result);
+		expect(result.errors).toBe(0);
+	}
+
+	it("login (PBKDF2)", async () => {
+		// Each login costs 100k PBKDF2 iterations, so run a quarter as many
+		await measure(
+			"login",
+			() => postJson("/login", { email: EMAIL, password: PASSWORD }),
+			Math.ceil(REQUESTS / 4),
+		);
+	}, 300_000);
+
+	it("JWT auth", async () => {
+		await measure("jwt auth", () =>
+			send("/api-keys", {
+				headers: { Authorization: `Bearer ${accessToken}` },
+			}),
+		);
+	}, 300_000);
+
+	it("API key auth", async () => {
+		await measure("api key auth", () =>
+			send("/api-keys", { headers: { Authorization: `Bearer ${apiKey}` } }),
+		);
+	}, 300_000);
+
+	it("refresh rotation", async () => {
+		// Every worker walks its own token chain
+		await measure("refresh rotation", async (worker) => {
+			const res = await postJson("/refresh", {
+				refresh_token: refreshTokens[worker],
+			});
+			if (res.ok) {
+				const body = (await res.clone().json()) as { refresh_token: string };
+				refreshTokens[worker] = body.refresh_token;
+			}
+			return res;
+		});
+	}, 300_000);
+
+	it("permission check", async () => {
+		await measure("permission check", () =>
+			send("/roles", { headers: { Authorization: `Bearer ${accessToken}` } }),
+		);
+	}, 300_000);
+
+	it("audit log paging", async () => {
+		await measure("audit first page", () =>
+			send("/audit-logs?limit=50", {
+				headers: { Authorization: `Bearer ${accessToken}` },
+			}),
+		);
+		await measure("audit cursor page", () =>
+			send(`/audit-logs?limit=50&cursor=${auditCursor}`, {
+				headers: { Authorization: `Bearer ${accessToken}` },
+			}),
+		);
+	}, 300_000);
+});
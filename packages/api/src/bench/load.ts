@@ -0,0 +1,159 @@
+export interface LoadOptions {
+	requests: number;
+	concurrency: number;
+	warmup?: number;
+}
+
+export interface PhaseTimings {
+	db: number;
+	crypto: number;
+	handler: number;
+}
+
+export interface LoadResult {
+	scenario: string;
+	requests: number;
+	concurrency: number;
+	errors: number;
+	throughput: number;
+	p50: number;
+	p95: number;
+	p99: number;
+	max: number;
+	// Mean Server-Timing split, when the app reported one
+	phases?: PhaseTimings;
+}
+
+/** Nearest-rank percentile of an ascending list. */
+export function percentile(sorted: number[], p: number): number {
+	if (sorted.length === 0) return 0;
+	const rank = Math.ceil((p / 100) * sorted.length);
+	return sorted[Math.min(sorted.length, Math.max(1, rank)) - 1];
+}
+
+export function parseServerTiming(header: string | null): PhaseTimings | null {
+	if (!header) return null;
+	const phases: PhaseTimings = { db: 0, crypto: 0, handler: 0 };
+	for (const metric of header.split(",")) {
+		const [name, ...params] = metric.trim().split(";");
+		if (!(name in phases)) continue;
+		const dur = params.find((param) => param.startsWith("dur="));
+		phases[name as keyof PhaseTimings] = Number(dur?.slice(4)) || 0;
+	}
+	return phases;
+}
+
+/**
+ * Fires `requests` calls at `send` from `concurrency` parallel workers and
+ * reports throughput and latency percentiles in milliseconds. `send` gets the
+ * worker index so scenarios can keep per-worker state such as a refresh
+ * token chain.
+ */
+export async function runLoad(
+	scenario: string,
+	send: (worker: number) => Promise<Response>,
+	options: LoadOptions,
+): Promise<LoadResult> {
+	for (let i = 0; i < (options.warmup ?? 0); i++) {
+		await (await send(0)).arrayBuffer();
+	}
+
+	const latencies: number[] = [];
+	const phaseTotals: PhaseTimings = { db: 0, crypto: 0, handler: 0 };
+	let timedResponses = 0;
+	let errors = 0;
+	let issued = 0;
+
+	const worker = async (index: number) => {
+		while (issued < options.requests) {
+			issued += 1;
+			const start = performance.now();
+			const res = await send(index);
+			await res.arrayBuffer();
+			latencies.push(performance.now() - start);
+
+			if (!res.ok) errors += 1;
+			const phases = parseServerTiming(res.headers.get("Server-Timing"));
+			if (phases) {
+				timedResponses += 1;
+				phaseTotals.db += phases.db;
+				phaseTotals.crypto += phases.crypto;
+				phaseTotals.handler += phases.handler;
+			}
+		}
+	};
+
+	const start = performance.now();
+	await Promise.all(
+		Array.from({ length: options.concurrency }, (_, i) => worker(i)),
+	);
+	const elapsed = performance.now() - start;
+
+	latencies.sort((a, b) => a - b);
+	return {
+		scenario,
+		requests: latencies.length,
+		concurrency: options.concurrency,
+		errors,
+		throughput: (latencies.length / elapsed) * 1000,
+		p50: percentile(latencies, 50),
+		p95: percentile(latencies, 95),
+		p99: percentile(latencies, 99),
+		max: latencies[latencies.length - 1] ?? 0,
+		phases:
+			timedResponses > 0
+				? {
+						db: phaseTotals.db / timedResponses,
+						crypto: phaseTotals.crypto / timedResponses,
+						handler: phaseTotals.handler / timedResponses,
+					}
+				: undefined,
+	};
+}
+
+export function formatLoadResults(results: LoadResult[]): string {
+	const fixed = (value: number | undefined) =>
+		value === undefined ? "-" : value.toFixed(2);
+	const rows = [
+		[
+			"scenario",
+			"req",
+			"conc",
+			"err",
+			"req/s",
+			"p50 ms",
+			"p95 ms",
+			"p99 ms",
+			"max ms",
+			"db ms",
+			"crypto ms",
+			"handler ms",
+		],
+		...results.map((r) => [
+			r.scenario,
+			String(r.requests),
+			String(r.concurrency),
+			String(r.errors),
+			r.throughput.toFixed(1),
+			fixed(r.p50),
+			fixed(r.p95),
+			fixed(r.p99),
+			fixed(r.max),
+			fixed(r.phases?.db),
+			fixed(r.phases?.crypto),
+			fixed(r.phases?.handler),
+		]),
+	];
+	const widths = rows[0].map((_, col) =>
+		Math.max(...rows.map((row) => row[col].length)),
+	);
+	return rows
+		.map((row) =>
+			row
+				.map((cell, col) =>
+					col === 0 ? cell.padEnd(widths[col]) : cell.padStart(widths[col]),
+				)
+				.join("  "),
+		)
+		.join("\n");
+}
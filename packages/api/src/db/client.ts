@@ -1,5 +1,6 @@
 import { type Client, createClient } from "@libsql/client";
 import { drizzle } from "drizzle-orm/libsql";
+import { timed } from "../timing";
 import * as schema from "./schema";
 
 export type DatabaseConfig = {
@@ -7,12 +8,49 @@ export type DatabaseConfig = {
 	authToken?: string;
 };
 
+// Client calls that reach the database; each is charged to the request's DB time
+const TIMED_METHODS = new Set<PropertyKey>([
+	"execute",
+	"batch",
+	"executeMultiple",
+	"migrate",
+]);
+
+function withQueryTiming(client: Client): Client {
+	return new Proxy(client, {
+		get(target, property) {
+			const value = Reflect.get(target, property, target);
+			if (typeof value !== "function" || property === "constructor") {
+				return value;
+			}
+			if (!TIMED_METHODS.has(property)) {
+				return value.bind(target);
+			}
+			return (...args: unknown[]) =>
+				timed("db", () => value.apply(target, args));
+		},
+	});
+}
+
 export function createDatabase(config: DatabaseConfig) {
 	const client: Client = createClient({
 		url: config.url,
 		authToken: config.authToken,
 	});
-	return drizzle(client, { schema });
+	return drizzle(withQueryTiming(client), { schema });
 }
 
 export type Database = ReturnType<typeof createDatabase>;
+
+// Isolate-scoped registry: one client per binding set, reused across requests
+const databases = new Map<string, Database>();
+
+export function getDatabase(config: DatabaseConfig): Database {
+	const key = `${config.url}\n${config.authToken ?? ""}`;
+	let db = databases.get(key);
+	if (!db) {
+		db = createDatabase(config);
+		databases.set(key, db);
+	}
+	return db;
+}
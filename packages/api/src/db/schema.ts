@@ -1,4 +1,10 @@
-import { integer, sqliteTable, text } from "drizzle-orm/sqlite-core";
+import {
+	index,
+	integer,
+	sqliteTable,
+	text,
+	uniqueIndex,
+} from "drizzle-orm/sqlite-core";
 
 export const healthChecks = sqliteTable("health_checks", {
 	id: integer("id").primaryKey({ autoIncrement: true }),
@@ -20,16 +26,23 @@ export const users = sqliteTable("users", {
 		.$defaultFn(() => new Date().toISOString()),
 });
 
-export const refreshTokens = sqliteTable("refresh_tokens", {
-	id: integer("id").primaryKey({ autoIncrement: true }),
-	token: text("token").unique().notNull(),
-	userId: integer("user_id").notNull(),
-	expiresAt: text("expires_at").notNull(),
-	revokedAt: text("revoked_at"),
-	createdAt: text("created_at")
-		.notNull()
-		.$defaultFn(() => new Date().toISOString()),
-});
+export const refreshTokens = sqliteTable(
+	"refresh_tokens",
+	{
+		id: integer("id").primaryKey({ autoIncrement: true }),
+		token: text("token").unique().notNull(),
+		userId: integer("user_id").notNull(),
+		expiresAt: text("expires_at").notNull(),
+		revokedAt: text("revoked_at"),
+		createdAt: text("created_at")
+			.notNull()
+			.$defaultFn(() => new Date().toISOString()),
+	},
+	(table) => [
+		// The scheduled sweep deletes by expiry; revoking a token also expires it
+		index("refresh_tokens_expires_at_idx").on(table.expiresAt),
+	],
+);
 
 export const roles = sqliteTable("roles", {
 	id: integer("id").primaryKey({ autoIncrement: true }),
@@ -48,34 +61,60 @@ export const permissions = sqliteTable("permissions", {
 		.$defaultFn(() => new Date().toISOString()),
 });
 
-export const rolePermissions = sqliteTable("role_permissions", {
-	id: integer("id").primaryKey({ autoIncrement: true }),
-	roleId: integer("role_id").notNull(),
-	permissionId: integer("permission_id").notNull(),
-	createdAt: text("created_at")
-		.notNull()
-		.$defaultFn(() => new Date().toISOString()),
-});
+export const rolePermissions = sqliteTable(
+	"role_permissions",
+	{
+		id: integer("id").primaryKey({ autoIncrement: true }),
+		roleId: integer("role_id").notNull(),
+		permissionId: integer("permission_id").notNull(),
+		createdAt: text("created_at")
+			.notNull()
+			.$defaultFn(() => new Date().toISOString()),
+	},
+	(table) => [
+		// Also serves lookups by role_id alone
+		uniqueIndex("role_permissions_role_id_permission_id_idx").on(
+			table.roleId,
+			table.permissionId,
+		),
+	],
+);
 
-export const userRoles = sqliteTable("user_roles", {
-	id: integer("id").primaryKey({ autoIncrement: true }),
-	userId: integer("user_id").notNull(),
-	roleId: integer("role_id").notNull(),
-	createdAt: text("created_at")
-		.notNull()
-		.$defaultFn(() => new Date().toISOString()),
-});
+export const userRoles = sqliteTable(
+	"user_roles",
+	{
+		id: integer("id").primaryKey({ autoIncrement: true }),
+		userId: integer("user_id").notNull(),
+		roleId: integer("role_id").notNull(),
+		createdAt: text("created_at")
+			.notNull()
+			.$defaultFn(() => new Date().toISOString()),
+	},
+	(table) => [
+		// Also serves lookups by user_id alone
+		uniqueIndex("user_roles_user_id_role_id_idx").on(table.userId, table.roleId),
+		// Role deletion checks whether any user still holds the role
+		index("user_roles_role_id_idx").on(table.roleId),
+	],
+);
 
-export const passwordResetTokens = sqliteTable("password_reset_tokens", {
-	id: integer("id").primaryKey({ autoIncrement: true }),
-	token: text("token").unique().notNull(),
-	userId: integer("user_id").notNull(),
-	expiresAt: text("expires_at").notNull(),
-	usedAt: text("used_at"),
-	createdAt: text("created_at")
-		.notNull()
-		.$defaultFn(() => new Date().toISOString()),
-});
+export const passwordResetTokens = sqliteTable(
+	"password_reset_tokens",
+	{
+		id: integer("id").primaryKey({ autoIncrement: true }),
+		token: text("token").unique().notNull(),
+		userId: integer("user_id").notNull(),
+		expiresAt: text("expires_at").notNull(),
+		usedAt: text("used_at"),
+		createdAt: text("created_at")
+			.notNull()
+			.$defaultFn(() => new Date().toISOString()),
+	},
+	(table) => [
+		// The scheduled sweep deletes by expiry; using a token also expires it
+		index("password_reset_tokens_expires_at_idx").on(table.expiresAt),
+	],
+);
 
 export const apiKeys = sqliteTable("api_keys", {
 	id: integer("id").primaryKey({ autoIncrement: true }),
@@ -87,15 +126,33 @@ export const apiKeys = sqliteTable("api_keys", {
 		.notNull()
 		.$defaultFn(() => new Date().toISOString()),
 	revokedAt: text("revoked_at"),
+	lastUsedAt: text("last_used_at"),
 });
 
-export const auditLogs = sqliteTable("audit_logs", {
-	id: integer("id").primaryKey({ autoIncrement: true }),
-	eventType: text("event_type").notNull(),
-	userId: text("user_id"),
-	ipAddress: text("ip_address").notNull(),
-	timestamp: text("timestamp")
-		.notNull()
-		.$defaultFn(() => new Date().toISOString()),
-	metadata: text("metadata"),
-});
+export const auditLogs = sqliteTable(
+	"audit_logs",
+	{
+		id: integer("id").primaryKey({ autoIncrement: true }),
+		eventType: text("event_type").notNull(),
+		userId: text("user_id"),
+		ipAddress: text("ip_address").notNull(),
+		timestamp: text("timestamp")
+			.notNull()
+			.$defaultFn(() => new Date().toISOString()),
+		metadata: text("metadata"),
+	},
+	(table) => [
+		// Keyset pagination walks (timestamp, id) descending, optionally scoped by a filter
+		index("audit_logs_timestamp_id_idx").on(table.timestamp, table.id),
+		index("audit_logs_event_type_timestamp_id_idx").on(
+			table.eventType,
+			table.timestamp,
+			table.id,
+		),
+		index("audit_logs_user_id_timestamp_id_idx").on(
+			table.userId,
+			table.timestamp,
+			table.id,
+		),
+	],
+);
@@ -1,21 +1,27 @@
-import { Hono } from "hono";
+import { type Context, Hono } from "hono";
 import forgotPassword from "./auth/forgot-password";
 import login from "./auth/login";
 import refresh from "./auth/refresh";
 import register from "./auth/register";
 import resetPassword from "./auth/reset-password";
 import revoke from "./auth/revoke";
-import { createDatabase } from "./db/client";
+import { cleanupExpiredTokens } from "./auth/token-cleanup";
+import { getDatabase } from "./db/client";
 import type { Database } from "./db/client";
+import { auditBuffer } from "./middleware/audit";
 import { authMiddleware } from "./middleware/auth";
 import { requirePermission } from "./middleware/authorization";
 import {
+	DurableObjectRateLimitStore,
 	InMemoryRateLimitStore,
 	KVRateLimitStore,
+	type RateLimitStore,
 	rateLimiter,
 } from "./middleware/rate-limiter";
+import { serverTiming } from "./middleware/server-timing";
 import apiKeys from "./rbac/api-keys";
 import auditLogs from "./rbac/audit-logs";
+import { R2ArchiveStore, archiveAuditLogs } from "./rbac/audit-retention";
 import roles from "./rbac/roles";
 import seed from "./rbac/seed";
 import userRoles from "./rbac/user-roles";
@@ -26,7 +32,19 @@ type Bindings = {
 	JWT_SECRET: string;
 	ASSETS: Fetcher;
 	RATE_LIMIT_KV?: KVNamespace;
+	RATE_LIMITER?: DurableObjectNamespace;
+	PERMISSIONS_KV?: KVNamespace;
 	ADMIN_SETUP_TOKEN?: string;
+	AUDIT_SAMPLE_RATES?: string;
+	AUDIT_ARCHIVE?: R2Bucket;
+	AUDIT_RETENTION_DAYS?: string;
+	AUDIT_RETENTION_BATCH_SIZE?: string;
+	AUDIT_RETENTION_MAX_BATCHES?: string;
+	AUDIT_RETENTION_TIME_BUDGET_MS?: string;
+	TOKEN_CLEANUP_BATCH_SIZE?: string;
+	TOKEN_CLEANUP_MAX_BATCHES?: string;
+	TOKEN_CLEANUP_TIME_BUDGET_MS?: string;
+	SERVER_TIMING?: string;
 };
 
 type Variables = {
@@ -36,19 +54,41 @@ type Variables = {
 
 const app = new Hono<{ Bindings: Bindings; Variables: Variables }>();
 
-// Fallback in-memory store used when KV is not available (e.g. tests)
+// Fallback in-memory store used when neither Durable Objects nor KV are bound (e.g. tests)
 const fallbackStore = new InMemoryRateLimitStore();
 
-app.use("*", async (c, next) => {
-	if (c.env.TURSO_DATABASE_URL) {
-		const db = createDatabase({
-			url: c.env.TURSO_DATABASE_URL,
-			authToken: c.env.TURSO_AUTH_TOKEN,
-		});
-		c.set("db", db);
-	}
-	await next();
-});
+// Only API routes get a database handle; static assets never touch it
+const DB_ROUTES = [
+	"/health",
+	"/register/*",
+	"/login/*",
+	"/refresh/*",
+	"/revoke/*",
+	"/forgot-password/*",
+	"/reset-password/*",
+	"/roles/*",
+	"/users/*",
+	"/audit-logs/*",
+	"/api-keys/*",
+	"/seed/*",
+];
+
+for (const path of DB_ROUTES) {
+	// Registered first so the whole request, middleware included, is timed
+	app.use(path, serverTiming());
+	app.use(path, async (c, next) => {
+		if (c.env.TURSO_DATABASE_URL) {
+			const db = getDatabase({
+				url: c.env.TURSO_DATABASE_URL,
+				authToken: c.env.TURSO_AUTH_TOKEN,
+			});
+			c.set("db", db);
+		}
+		await next();
+	});
+	// Audit entries are queued per request and written after the response
+	app.use(path, auditBuffer());
+}
 
 app.get("/health", async (c) => {
 	const db = c.get("db");
@@ -63,36 +103,36 @@ app.get("/health", async (c) => {
 	}
 });
 
-function getStore(env: { RATE_LIMIT_KV?: KVNamespace }) {
-	if (env.RATE_LIMIT_KV) {
-		return new KVRateLimitStore(env.RATE_LIMIT_KV);
+// Stores wrap per-isolate bindings, so build each one once and reuse it
+const bindingStores = new WeakMap<object, RateLimitStore>();
+
+function getStore(c: Context<{ Bindings: Bindings }>): RateLimitStore {
+	const { RATE_LIMITER, RATE_LIMIT_KV } = c.env;
+	const binding = RATE_LIMITER ?? RATE_LIMIT_KV;
+	if (!binding) {
+		return fallbackStore;
+	}
+	let store = bindingStores.get(binding);
+	if (!store) {
+		store = RATE_LIMITER
+			? new DurableObjectRateLimitStore(RATE_LIMITER)
+			: new KVRateLimitStore(binding as KVNamespace);
+		bindingStores.set(binding, store);
 	}
-	return fallbackStore;
+	return store;
 }
 
 // Rate-limited auth routes
 const loginApp = new Hono<{ Bindings: Bindings; Variables: Variables }>();
-loginApp.use("*", async (c, next) => {
-	const store = getStore(c.env);
-	const mw = rateLimiter({ limit: 10, windowMs: 60_000, store });
-	return mw(c, next);
-});
+loginApp.use("*", rateLimiter({ limit: 10, windowMs: 60_000, store: getStore }));
 loginApp.route("/", login);
 
 const registerApp = new Hono<{ Bindings: Bindings; Variables: Variables }>();
-registerApp.use("*", async (c, next) => {
-	const store = getStore(c.env);
-	const mw = rateLimiter({ limit: 5, windowMs: 60_000, store });
-	return mw(c, next);
-});
+registerApp.use("*", rateLimiter({ limit: 5, windowMs: 60_000, store: getStore }));
 registerApp.route("/", register);
 
 const refreshApp = new Hono<{ Bindings: Bindings; Variables: Variables }>();
-refreshApp.use("*", async (c, next) => {
-	const store = getStore(c.env);
-	const mw = rateLimiter({ limit: 10, windowMs: 60_000, store });
-	return mw(c, next);
-});
+refreshApp.use("*", rateLimiter({ limit: 10, windowMs: 60_000, store: getStore }));
 refreshApp.route("/", refresh);
 
 app.route("/register", registerApp);
@@ -134,4 +174,35 @@ app.get("*", async (c) => {
 	return c.env.ASSETS.fetch(c.req.raw);
 });
 
-export default app;
+export { RateLimitCounter } from "./middleware/rate-limiter";
+export { app };
+
+export default {
+	fetch: app.fetch,
+	async scheduled(_controller, env, ctx) {
+		if (!env.TURSO_DATABASE_URL) return;
+		const db = getDatabase({
+			url: env.TURSO_DATABASE_URL,
+			authToken: env.TURSO_AUTH_TOKEN,
+		});
+		ctx.waitUntil(
+			cleanupExpiredTokens(db, {
+				batchSize: Number(env.TOKEN_CLEANUP_BATCH_SIZE) || undefined,
+				maxBatches: Number(env.TOKEN_CLEANUP_MAX_BATCHES) || undefined,
+				timeBudgetMs: Number(env.TOKEN_CLEANUP_TIME_BUDGET_MS) || undefined,
+			}),
+		);
+		// Rows are only trimmed when there is somewhere to archive them
+		if (env.AUDIT_ARCHIVE) {
+			ctx.waitUntil(
+				archiveAuditLogs(db, new R2ArchiveStore(env.AUDIT_ARCHIVE), {
+					retentionDays: Number(env.AUDIT_RETENTION_DAYS) || undefined,
+					batchSize: Number(env.AUDIT_RETENTION_BATCH_SIZE) || undefined,
+					maxBatches: Number(env.AUDIT_RETENTION_MAX_BATCHES) || undefined,
+					timeBudgetMs:
+						Number(env.AUDIT_RETENTION_TIME_BUDGET_MS) || undefined,
+				}),
+			);
+		}
+	},
+} satisfies ExportedHandler<Bindings>;
@@ -0,0 +1,17 @@
+// Map iteration order is insertion order, so these keep a Map in recency
+// order and trim it from the least recently used end.
+
+/** Moves `key` to the most recently used end. */
+export function touch<K, V>(map: Map<K, V>, key: K, value: V) {
+	map.delete(key);
+	map.set(key, value);
+}
+
+/** Drops least recently used entries until at most `maxEntries` remain. */
+export function evict<K, V>(map: Map<K, V>, maxEntries: number) {
+	while (map.size > maxEntries) {
+		const oldest = map.keys().next().value;
+		if (oldest === undefined) break;
+		map.delete(oldest);
+	}
+}
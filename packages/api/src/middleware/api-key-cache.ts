@@ -0,0 +1,227 @@
+import { eq, sql } from "drizzle-orm";
+import type { Database } from "../db/client";
+import { apiKeys } from "../db/schema";
+import { evict, touch } from "../lru";
+
+export interface ApiKeyIdentity {
+	keyId: number;
+	userId: number;
+}
+
+export interface ApiKeyCacheOptions {
+	maxEntries?: number;
+	ttlMs?: number;
+	maxNegativeEntries?: number;
+	negativeTtlMs?: number;
+}
+
+export interface ApiKeyCacheStats {
+	hits: number;
+	negativeHits: number;
+	misses: number;
+	size: number;
+	negativeSize: number;
+}
+
+interface CacheEntry {
+	identity: ApiKeyIdentity;
+	expiresAt: number;
+}
+
+// Generated keys are "crb_" followed by 32 random bytes in hex
+const API_KEY_PATTERN = /^crb_[0-9a-f]{64}$/;
+
+export function isWellFormedApiKey(token: string): boolean {
+	return API_KEY_PATTERN.test(token);
+}
+
+/**
+ * Maps API key hashes to the key's identity. Revocation is immediate in the
+ * isolate that handles the DELETE, but other isolates keep accepting a revoked
+ * key until their cached entry expires, so valid keys are cached for only a
+ * few seconds (`ttlMs`, 5s by default). Unknown or revoked hashes go to a
+ * separate, bounded negative cache so floods of bogus keys are answered
+ * without a database round-trip.
+ */
+export class ApiKeyCache {
+	private entries = new Map<string, CacheEntry>();
+	private negative = new Map<string, number>();
+	private maxEntries: number;
+	private ttlMs: number;
+	private maxNegativeEntries: number;
+	private negativeTtlMs: number;
+	private counters = { hits: 0, negativeHits: 0, misses: 0 };
+
+	constructor(options: ApiKeyCacheOptions = {}) {
+		this.maxEntries = options.maxEntries ?? 1000;
+		this.ttlMs = options.ttlMs ?? 5_000;
+		this.maxNegativeEntries = options.maxNegativeEntries ?? 10_000;
+		this.negativeTtlMs = options.negativeTtlMs ?? 300_000;
+	}
+
+	async resolve(
+		keyHash: string,
+		load: () => Promise<ApiKeyIdentity | null>,
+	): Promise<{ identity: ApiKeyIdentity | null; hit: boolean }> {
+		const now = Date.now();
+
+		const entry = this.entries.get(keyHash);
+		if (entry && entry.expiresAt > now) {
+			touch(this.entries, keyHash, entry);
+			this.counters.hits += 1;
+			return { identity: entry.identity, hit: true };
+		}
+
+		const negativeUntil = this.negative.get(keyHash);
+		if (negativeUntil !== undefined && negativeUntil > now) {
+			this.counters.negativeHits += 1;
+			return { identity: null, hit: true };
+		}
+
+		this.counters.misses += 1;
+		const identity = await load();
+		if (!identity) {
+			this.remember(keyHash, now);
+		} else if (!this.negative.has(keyHash)) {
+			// Skip the store if the key was revoked while we were loading
+			touch(this.entries, keyHash, { identity, expiresAt: now + this.ttlMs });
+			evict(this.entries, this.maxEntries);
+		}
+		return { identity, hit: false };
+	}
+
+	/** Drops a revoked key and answers for it from the negative cache. */
+	revoke(keyHash: string) {
+		this.entries.delete(keyHash);
+		this.remember(keyHash, Date.now());
+	}
+
+	/** Drops any cached answer, e.g. for a freshly created key. */
+	forget(keyHash: string) {
+		this.entries.delete(keyHash);
+		this.negative.delete(keyHash);
+	}
+
+	stats(): ApiKeyCacheStats {
+		return {
+			...this.counters,
+			size: this.entries.size,
+			negativeSize: this.negative.size,
+		};
+	}
+
+	private remember(keyHash: string, now: number) {
+		touch(this.negative, keyHash, now + this.negativeTtlMs);
+		evict(this.negative, this.maxNegativeEntries);
+	}
+}
+
+export interface ApiKeyUsageOptions {
+	debounceMs?: number;
+	maxBatchSize?: number;
+}
+
+/**
+ * Debounces last_used_at writes: each key is stamped at most once per
+ * debounce window, and pending stamps are written together in one batch.
+ */
+export class ApiKeyUsageTracker {
+	private pending = new Map<number, string>();
+	private lastRecorded = new Map<number, number>();
+	private debounceMs: number;
+	private maxBatchSize: number;
+	private counters = { written: 0, failed: 0 };
+
+	constructor(options: ApiKeyUsageOptions = {}) {
+		this.debounceMs = options.debounceMs ?? 60_000;
+		this.maxBatchSize = options.maxBatchSize ?? 100;
+	}
+
+	/** Records a use; returns true when the key is due a write. */
+	record(keyId: number, now = Date.now()): boolean {
+		const last = this.lastRecorded.get(keyId);
+		if (last !== undefined && now - last < this.debounceMs) {
+			return false;
+		}
+		this.lastRecorded.set(keyId, now);
+		this.pending.set(keyId, new Date(now).toISOString());
+		return true;
+	}
+
+	async flush(db: Database): Promise<void> {
+		const now = Date.now();
+		for (const [keyId, recordedAt] of this.lastRecorded) {
+			if (now - recordedAt >= this.debounceMs) {
+				this.lastRecorded.delete(keyId);
+			}
+		}
+
+		while (this.pending.size > 0) {
+			const batch = [...this.pending].slice(0, this.maxBatchSize);
+			for (const [keyId] of batch) {
+				this.pending.delete(keyId);
+			}
+
+			try {
+				const [first, ...rest] = batch.map(([keyId, usedAt]) =>
+					db
+						.update(apiKeys)
+						// Never move the stamp backwards if a newer write landed first
+						.set({
+							lastUsedAt: sql`max(coalesce(${apiKeys.lastUsedAt}, ''), ${usedAt})`,
+						})
+						.where(eq(apiKeys.id, keyId)),
+				);
+				await db.batch([first, ...rest]);
+				this.counters.written += batch.length;
+			} catch {
+				// Best-effort, like audit writes — a missed stamp is not worth a retry
+				this.counters.failed += batch.length;
+			}
+		}
+	}
+
+	stats() {
+		return { ...this.counters, pending: this.pending.size };
+	}
+}
+
+// One cache and tracker per database handle, like the permission cache
+const caches = new WeakMap<Database, ApiKeyCache>();
+const trackers = new WeakMap<Database, ApiKeyUsageTracker>();
+
+export function getApiKeyCache(db: Database): ApiKeyCache {
+	let cache = caches.get(db);
+	if (!cache) {
+		cache = new ApiKeyCache();
+		caches.set(db, cache);
+	}
+	return cache;
+}
+
+export function getApiKeyUsageTracker(db: Database): ApiKeyUsageTracker {
+	let tracker = trackers.get(db);
+	if (!tracker) {
+		tracker = new ApiKeyUsageTracker();
+		trackers.set(db, tracker);
+	}
+	return tracker;
+}
+
+export async function loadApiKey(
+	db: Database,
+	keyHash: string,
+): Promise<ApiKeyIdentity | null> {
+	const row = await db
+		.select({
+			id: apiKeys.id,
+			userId: apiKeys.userId,
+			revokedAt: apiKeys.revokedAt,
+		})
+		.from(apiKeys)
+		.where(eq(apiKeys.keyHash, keyHash))
+		.get();
+
+	if (!row || row.revokedAt) return null;
+	return { keyId: row.id, userId: row.userId };
+}
@@ -1,6 +1,7 @@
-import type { Context } from "hono";
+import type { Context, Next } from "hono";
 import type { Database } from "../db/client";
 import { auditLogs } from "../db/schema";
+import { deferOrAwait } from "./defer";
 
 export interface AuditEntry {
 	eventType: string;
@@ -9,6 +10,25 @@ export interface AuditEntry {
 	metadata?: string | null;
 }
 
+export interface AuditSinkOptions {
+	// Flush once this many entries are queued
+	maxBatchSize?: number;
+	// Flush once the oldest queued entry is this old; 0 flushes after every request
+	maxAgeMs?: number;
+	// Hard cap on queued entries; the oldest are dropped beyond it
+	maxQueueSize?: number;
+	// Per-event-type keep probability in [0, 1]; unlisted types are always kept
+	sampleRates?: Record<string, number>;
+}
+
+export interface AuditSinkStats {
+	queued: number;
+	written: number;
+	sampledOut: number;
+	dropped: number;
+	failed: number;
+}
+
 export function getClientIp(c: Context): string {
 	return (
 		c.req.header("CF-Connecting-IP") ||
@@ -29,3 +49,160 @@ export async function writeAuditLog(db: Database, entry: AuditEntry) {
 		// Audit logging is best-effort — don't break the main operation
 	}
 }
+
+type QueuedEntry = AuditEntry & { timestamp: string };
+
+export class AuditSink {
+	private queue: QueuedEntry[] = [];
+	private oldestAt = 0;
+	private flushing: Promise<void> | null = null;
+	private maxBatchSize: number;
+	private maxAgeMs: number;
+	private maxQueueSize: number;
+	private sampleRates: Record<string, number>;
+	private counters = { written: 0, sampledOut: 0, dropped: 0, failed: 0 };
+
+	constructor(
+		private db: Database,
+		options: AuditSinkOptions = {},
+	) {
+		this.maxBatchSize = options.maxBatchSize ?? 50;
+		this.maxAgeMs = options.maxAgeMs ?? 0;
+		this.maxQueueSize = Math.max(
+			options.maxQueueSize ?? 1000,
+			this.maxBatchSize,
+		);
+		this.sampleRates = options.sampleRates ?? {};
+	}
+
+	enqueue(entry: AuditEntry) {
+		const rate = this.sampleRates[entry.eventType];
+		if (rate !== undefined && Math.random() >= rate) {
+			this.counters.sampledOut += 1;
+			return;
+		}
+
+		if (this.queue.length >= this.maxQueueSize) {
+			this.queue.shift();
+			this.counters.dropped += 1;
+		}
+		if (this.queue.length === 0) {
+			this.oldestAt = Date.now();
+		}
+		// Stamp now so a deferred flush doesn't skew event ordering
+		this.queue.push({ ...entry, timestamp: new Date().toISOString() });
+	}
+
+	shouldFlush(): boolean {
+		if (this.queue.length === 0) return false;
+		return (
+			this.queue.length >= this.maxBatchSize ||
+			Date.now() - this.oldestAt >= this.maxAgeMs
+		);
+	}
+
+	flush(): Promise<void> {
+		if (this.flushing) {
+			// The running drain may already have seen an empty queue, so follow
+			// it with another rather than letting new entries wait for a later
+			// request that may never come
+			return this.flushing.then(() => this.flush());
+		}
+		this.flushing = this.drain().finally(() => {
+			this.flushing = null;
+		});
+		return this.flushing;
+	}
+
+	stats(): AuditSinkStats {
+		return { queued: this.queue.length, ...this.counters };
+	}
+
+	private async drain() {
+		while (this.queue.length > 0) {
+			const batch = this.queue.splice(0, this.maxBatchSize);
+			this.oldestAt = Date.now();
+			try {
+				await this.db.insert(auditLogs).values(
+					batch.map((entry) => ({
+						eventType: entry.eventType,
+						userId: entry.userId,
+						ipAddress: entry.ipAddress,
+						timestamp: entry.timestamp,
+						metadata: entry.metadata ?? null,
+					})),
+				);
+				this.counters.written += batch.length;
+			} catch {
+				// Best-effort, like writeAuditLog — drop the batch rather than retry
+				this.counters.failed += batch.length;
+			}
+		}
+	}
+}
+
+const sinks = new WeakMap<Database, AuditSink>();
+
+export function getAuditSink(
+	db: Database,
+	options: AuditSinkOptions = {},
+): AuditSink {
+	let sink = sinks.get(db);
+	if (!sink) {
+		sink = new AuditSink(db, options);
+		sinks.set(db, sink);
+	}
+	return sink;
+}
+
+export function parseSampleRates(value?: string): Record<string, number> {
+	if (!value) return {};
+	try {
+		const parsed = JSON.parse(value) as Record<string, unknown>;
+		const rates: Record<string, number> = {};
+		for (const [eventType, rate] of Object.entries(parsed)) {
+			if (typeof rate === "number" && rate >= 0 && rate <= 1) {
+				rates[eventType] = rate;
+			}
+		}
+		return rates;
+	} catch {
+		return {};
+	}
+}
+
+/**
+ * Queues audit entries for the request and writes them in multi-row batches
+ * after the response, via executionCtx.waitUntil when available.
+ */
+export function auditBuffer(options: AuditSinkOptions = {}) {
+	return async (c: Context, next: Next) => {
+		const db: Database | undefined = c.get("db");
+		if (!db) {
+			await next();
+			return;
+		}
+
+		const sink = getAuditSink(db, {
+			...options,
+			sampleRates: {
+				...options.sampleRates,
+				...parseSampleRates(c.env?.AUDIT_SAMPLE_RATES),
+			},
+		});
+		c.set("auditSink", sink);
+		await next();
+
+		if (!sink.shouldFlush()) return;
+		await deferOrAwait(c, sink.flush());
+	};
+}
+
+export async function recordAuditLog(c: Context, entry: AuditEntry) {
+	const sink: AuditSink | undefined = c.get("auditSink");
+	if (sink) {
+		sink.enqueue(entry);
+		return;
+	}
+	await writeAuditLog(c.get("db"), entry);
+}
@@ -1,7 +1,13 @@
-import { eq } from "drizzle-orm";
 import type { Context, Next } from "hono";
 import { hashApiKey, verifyJwt } from "../auth/crypto";
-import { apiKeys } from "../db/schema";
+import type { Database } from "../db/client";
+import {
+	getApiKeyCache,
+	getApiKeyUsageTracker,
+	isWellFormedApiKey,
+	loadApiKey,
+} from "./api-key-cache";
+import { deferOrAwait } from "./defer";
 
 export function authMiddleware() {
 	return async (c: Context, next: Next) => {
@@ -13,24 +19,27 @@ export function authMiddleware() {
 		const token = authHeader.slice(7);
 
 		if (token.startsWith("crb_")) {
-			const db = c.get("db");
-			const keyHash = await hashApiKey(token);
-			const apiKey = await db
-				.select()
-				.from(apiKeys)
-				.where(eq(apiKeys.keyHash, keyHash))
-				.get();
-
-			if (!apiKey) {
+			// Malformed keys can never match, so skip hashing and the lookup
+			if (!isWellFormedApiKey(token)) {
 				return c.json({ error: "Invalid token" }, 401);
 			}
 
-			if (apiKey.revokedAt) {
+			const db: Database = c.get("db");
+			const keyHash = await hashApiKey(token);
+			const { identity } = await getApiKeyCache(db).resolve(keyHash, () =>
+				loadApiKey(db, keyHash),
+			);
+
+			if (!identity) {
 				return c.json({ error: "Invalid token" }, 401);
 			}
 
-			c.set("user", { sub: String(apiKey.userId), iat: 0, exp: 0 });
+			c.set("user", { sub: String(identity.userId), iat: 0, exp: 0 });
 			await next();
+
+			const tracker = getApiKeyUsageTracker(db);
+			if (!tracker.record(identity.keyId)) return;
+			await deferOrAwait(c, tracker.flush(db));
 			return;
 		}
 
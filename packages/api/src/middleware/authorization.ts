@@ -1,7 +1,6 @@
-import { eq } from "drizzle-orm";
 import type { Context, Next } from "hono";
-import { permissions, rolePermissions, userRoles } from "../db/schema";
-import { getClientIp, writeAuditLog } from "./audit";
+import { getClientIp, recordAuditLog } from "./audit";
+import { getPermissionCache, loadUserPermissions } from "./permission-cache";
 
 export function requirePermission(permissionName: string) {
 	return async (c: Context, next: Next) => {
@@ -9,20 +8,16 @@ export function requirePermission(permissionName: string) {
 		const db = c.get("db");
 		const userId = Number(user.sub);
 
-		const rows = await db
-			.select({ permission: permissions.permission })
-			.from(userRoles)
-			.innerJoin(rolePermissions, eq(userRoles.roleId, rolePermissions.roleId))
-			.innerJoin(permissions, eq(rolePermissions.permissionId, permissions.id))
-			.where(eq(userRoles.userId, userId))
-			.all();
-
-		const hasPermission = rows.some(
-			(r: { permission: string }) => r.permission === permissionName,
+		const { permissions } = await getPermissionCache(db).resolve(
+			userId,
+			() => loadUserPermissions(db, userId),
+			c.env?.PERMISSIONS_KV,
 		);
 
+		const hasPermission = permissions.has(permissionName);
+
 		if (!hasPermission) {
-			await writeAuditLog(db, {
+			await recordAuditLog(c, {
 				eventType: "authz_denied",
 				userId: user.sub,
 				ipAddress: getClientIp(c),
@@ -31,7 +26,7 @@ export function requirePermission(permissionName: string) {
 			return c.json({ error: "Forbidden" }, 403);
 		}
 
-		await writeAuditLog(db, {
+		await recordAuditLog(c, {
 			eventType: "authz_granted",
 			userId: user.sub,
 			ipAddress: getClientIp(c),
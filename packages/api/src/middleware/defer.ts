@@ -0,0 +1,15 @@
+import type { Context } from "hono";
+
+/**
+ * Hands best-effort work to executionCtx.waitUntil so it finishes after the
+ * response, or awaits it inline when there is no ExecutionContext (e.g. tests).
+ */
+export async function deferOrAwait(c: Context, work: Promise<unknown>) {
+	try {
+		c.executionCtx.waitUntil(work);
+		return;
+	} catch {
+		// No ExecutionContext — fall through and wait for it here
+	}
+	await work;
+}
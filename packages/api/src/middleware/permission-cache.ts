@@ -0,0 +1,178 @@
+import { eq } from "drizzle-orm";
+import type { Context } from "hono";
+import type { Database } from "../db/client";
+import { permissions, rolePermissions, userRoles } from "../db/schema";
+import { evict, touch } from "../lru";
+
+export interface PermissionCacheOptions {
+	maxEntries?: number;
+	ttlMs?: number;
+}
+
+export interface PermissionCacheStats {
+	hits: number;
+	misses: number;
+	kvHits: number;
+	invalidations: number;
+	size: number;
+}
+
+interface CacheEntry {
+	permissions: ReadonlySet<string>;
+	version: number;
+	expiresAt: number;
+}
+
+const VERSION_KEY = "rbac:permissions:version";
+// KV rejects expirationTtl values below 60 seconds
+const MIN_KV_TTL_SECONDS = 60;
+
+/**
+ * Caches each user's permission set in memory and, when a KV namespace is
+ * bound, in a shared KV tier keyed by a version stamp. An invalidation is
+ * immediate in the isolate that makes it. Other isolates only see it after
+ * their next poll of the stamp, and KV edge-caches that read for up to 60s,
+ * so they can keep serving (and reloading from KV) the old sets for roughly
+ * 60s plus `ttlMs` after a role change.
+ */
+export class PermissionCache {
+	private entries = new Map<number, CacheEntry>();
+	private version = 0;
+	private versionCheckedAt = 0;
+	private maxEntries: number;
+	private ttlMs: number;
+	private counters = { hits: 0, misses: 0, kvHits: 0, invalidations: 0 };
+
+	constructor(options: PermissionCacheOptions = {}) {
+		this.maxEntries = options.maxEntries ?? 1000;
+		this.ttlMs = options.ttlMs ?? 30_000;
+	}
+
+	async resolve(
+		userId: number,
+		load: () => Promise<string[]>,
+		kv?: KVNamespace,
+	): Promise<{ permissions: ReadonlySet<string>; hit: boolean }> {
+		if (kv) {
+			await this.syncVersion(kv);
+		}
+
+		const now = Date.now();
+		const entry = this.entries.get(userId);
+		if (entry && entry.version === this.version && entry.expiresAt > now) {
+			touch(this.entries, userId, entry);
+			this.counters.hits += 1;
+			return { permissions: entry.permissions, hit: true };
+		}
+
+		this.counters.misses += 1;
+		const version = this.version;
+		const kvKey = `rbac:permissions:${version}:${userId}`;
+
+		let resolved: string[] | null = null;
+		if (kv) {
+			resolved = await kv.get<string[]>(kvKey, "json");
+			if (resolved) {
+				this.counters.kvHits += 1;
+			}
+		}
+
+		if (!resolved) {
+			resolved = await load();
+			if (kv) {
+				// Outlives ttlMs because of the KV minimum, but stops being read
+				// once this isolate sees a newer version stamp
+				await kv.put(kvKey, JSON.stringify(resolved), {
+					expirationTtl: Math.max(
+						MIN_KV_TTL_SECONDS,
+						Math.ceil(this.ttlMs / 1000),
+					),
+				});
+			}
+		}
+
+		const permissionSet = new Set(resolved);
+		// An invalidation may have landed while we were loading
+		if (version === this.version) {
+			this.store(userId, {
+				permissions: permissionSet,
+				version,
+				expiresAt: now + this.ttlMs,
+			});
+		}
+		return { permissions: permissionSet, hit: false };
+	}
+
+	async invalidate(kv?: KVNamespace): Promise<void> {
+		this.counters.invalidations += 1;
+		let next = this.version + 1;
+		if (kv) {
+			const remote = Number(await kv.get(VERSION_KEY)) || 0;
+			next = Math.max(next, remote + 1);
+			await kv.put(VERSION_KEY, String(next));
+			this.versionCheckedAt = Date.now();
+		}
+		this.version = next;
+		this.entries.clear();
+	}
+
+	stats(): PermissionCacheStats {
+		return { ...this.counters, size: this.entries.size };
+	}
+
+	private async syncVersion(kv: KVNamespace) {
+		// Other isolates bump the stamp in KV; poll it at most once per TTL. The
+		// read itself may be up to 60s stale, which bounds how late a remote
+		// invalidation is observed (see the class comment).
+		const now = Date.now();
+		if (now - this.versionCheckedAt < this.ttlMs) {
+			return;
+		}
+		this.versionCheckedAt = now;
+		const remote = Number(await kv.get(VERSION_KEY)) || 0;
+		if (remote > this.version) {
+			this.version = remote;
+			this.entries.clear();
+		}
+	}
+
+	private store(userId: number, entry: CacheEntry) {
+		touch(this.entries, userId, entry);
+		evict(this.entries, this.maxEntries);
+	}
+}
+
+// One cache per database handle, so separate databases (e.g. per-test
+// in-memory instances) never share resolved permissions. The worker takes its
+// handles from getDatabase's isolate registry, which makes this one cache per
+// set of database bindings that outlives individual requests.
+const caches = new WeakMap<Database, PermissionCache>();
+
+export function getPermissionCache(db: Database): PermissionCache {
+	let cache = caches.get(db);
+	if (!cache) {
+		cache = new PermissionCache();
+		caches.set(db, cache);
+	}
+	return cache;
+}
+
+export async function loadUserPermissions(
+	db: Database,
+	userId: number,
+): Promise<string[]> {
+	const rows = await db
+		.select({ permission: permissions.permission })
+		.from(userRoles)
+		.innerJoin(rolePermissions, eq(userRoles.roleId, rolePermissions.roleId))
+		.innerJoin(permissions, eq(rolePermissions.permissionId, permissions.id))
+		.where(eq(userRoles.userId, userId))
+		.all();
+
+	return [...new Set(rows.map((r: { permission: string }) => r.permission))];
+}
+
+export async function invalidatePermissions(c: Context) {
+	const db: Database = c.get("db");
+	await getPermissionCache(db).invalidate(c.env?.PERMISSIONS_KV);
+}
@@ -5,28 +5,86 @@ export interface RateLimitStore {
 	increment(key: string, windowMs: number): Promise<number>;
 }
 
+/**
+ * Sliding-window counter: the previous fixed window's count is weighted by
+ * how much of it still overlaps the trailing window, which stops the 2×
+ * burst a plain fixed window lets through at its edges.
+ */
+export interface SlidingWindowState {
+	windowMs: number;
+	windowStart: number;
+	current: number;
+	previous: number;
+}
+
+export function rollWindow(
+	state: SlidingWindowState | null | undefined,
+	now: number,
+	windowMs: number,
+): SlidingWindowState {
+	const windowStart = Math.floor(now / windowMs) * windowMs;
+	if (!state || state.windowMs !== windowMs) {
+		return { windowMs, windowStart, current: 0, previous: 0 };
+	}
+	if (state.windowStart === windowStart) {
+		return state;
+	}
+	return {
+		windowMs,
+		windowStart,
+		current: 0,
+		previous: state.windowStart === windowStart - windowMs ? state.current : 0,
+	};
+}
+
+export function estimateCount(state: SlidingWindowState, now: number): number {
+	const elapsed = (now - state.windowStart) / state.windowMs;
+	// Round the carried-over share up so the estimate never undercounts
+	return Math.ceil(state.previous * (1 - elapsed)) + state.current;
+}
+
+export function isWindowExpired(state: SlidingWindowState, now: number) {
+	return now >= state.windowStart + 2 * state.windowMs;
+}
+
 export class InMemoryRateLimitStore implements RateLimitStore {
-	private store = new Map<string, { count: number; expiresAt: number }>();
+	private store = new Map<string, SlidingWindowState>();
+	private lastSweep = Date.now();
+
+	constructor(private sweepIntervalMs = 60_000) {}
+
+	get size(): number {
+		return this.store.size;
+	}
 
 	async get(key: string): Promise<number> {
 		const entry = this.store.get(key);
-		if (!entry || Date.now() > entry.expiresAt) {
+		if (!entry) {
 			return 0;
 		}
-		return entry.count;
+		const now = Date.now();
+		return estimateCount(rollWindow(entry, now, entry.windowMs), now);
 	}
 
 	async increment(key: string, windowMs: number): Promise<number> {
 		const now = Date.now();
-		const entry = this.store.get(key);
-
-		if (!entry || now > entry.expiresAt) {
-			this.store.set(key, { count: 1, expiresAt: now + windowMs });
-			return 1;
+		if (now - this.lastSweep >= this.sweepIntervalMs) {
+			this.sweep(now);
 		}
 
-		entry.count += 1;
-		return entry.count;
+		const entry = rollWindow(this.store.get(key), now, windowMs);
+		const next = { ...entry, current: entry.current + 1 };
+		this.store.set(key, next);
+		return estimateCount(next, now);
+	}
+
+	sweep(now = Date.now()) {
+		this.lastSweep = now;
+		for (const [key, entry] of this.store) {
+			if (isWindowExpired(entry, now)) {
+				this.store.delete(key);
+			}
+		}
 	}
 }
 
@@ -48,10 +106,93 @@ export class KVRateLimitStore implements RateLimitStore {
 	}
 }
 
+/**
+ * Durable Object holding one sliding-window counter per rate-limit key.
+ * Increments are applied synchronously on the in-memory copy, so concurrent
+ * requests for the same key can never lose counts.
+ */
+export class RateLimitCounter {
+	private counter: SlidingWindowState | null = null;
+	private loading: Promise<void> | null = null;
+
+	constructor(private state: DurableObjectState) {}
+
+	async fetch(request: Request): Promise<Response> {
+		await this.load();
+		const now = Date.now();
+
+		if (request.method !== "POST") {
+			const count = this.counter
+				? estimateCount(rollWindow(this.counter, now, this.counter.windowMs), now)
+				: 0;
+			return Response.json({ count });
+		}
+
+		const windowMs = Number(new URL(request.url).searchParams.get("windowMs"));
+		if (!windowMs || windowMs <= 0) {
+			return Response.json({ error: "windowMs is required" }, { status: 400 });
+		}
+
+		const previous = this.counter;
+		const entry = rollWindow(previous, now, windowMs);
+		const next = { ...entry, current: entry.current + 1 };
+		this.counter = next;
+
+		await this.state.storage.put("counter", next);
+		if (!previous || previous.windowStart !== next.windowStart) {
+			await this.state.storage.setAlarm(next.windowStart + 2 * windowMs);
+		}
+
+		return Response.json({ count: estimateCount(next, now) });
+	}
+
+	async alarm() {
+		if (this.counter && !isWindowExpired(this.counter, Date.now())) {
+			return;
+		}
+		this.counter = null;
+		await this.state.storage.deleteAll();
+	}
+
+	private load(): Promise<void> {
+		if (!this.loading) {
+			this.loading = this.state.storage
+				.get<SlidingWindowState>("counter")
+				.then((stored) => {
+					this.counter = stored ?? null;
+				});
+		}
+		return this.loading;
+	}
+}
+
+export class DurableObjectRateLimitStore implements RateLimitStore {
+	constructor(private namespace: DurableObjectNamespace) {}
+
+	async get(key: string): Promise<number> {
+		const res = await this.stub(key).fetch("https://rate-limiter/");
+		const { count } = (await res.json()) as { count: number };
+		return count;
+	}
+
+	async increment(key: string, windowMs: number): Promise<number> {
+		const res = await this.stub(key).fetch(
+			`https://rate-limiter/?windowMs=${windowMs}`,
+			{ method: "POST" },
+		);
+		const { count } = (await res.json()) as { count: number };
+		return count;
+	}
+
+	private stub(key: string) {
+		return this.namespace.get(this.namespace.idFromName(key));
+	}
+}
+
 interface RateLimiterConfig {
 	limit: number;
 	windowMs: number;
-	store: RateLimitStore;
+	store: RateLimitStore | ((c: Context) => RateLimitStore);
 }
 
 export function rateLimiter(config: RateLimiterConfig) {
@@ -65,7 +206,8 @@ export function rateLimiter(config: RateLimiterConfig) {
 		const path = new URL(c.req.url).pathname;
 		const key = `rate-limit:${ip}:${path}`;
 
-		const count = await store.increment(key, windowMs);
+		const resolved = typeof store === "function" ? store(c) : store;
+		const count = await resolved.increment(key, windowMs);
 		const remaining = Math.max(0, limit - count);
 		const resetAt = Math.ceil((Date.now() + windowMs) / 1000);
 
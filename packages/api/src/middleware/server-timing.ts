@@ -0,0 +1,90 @@
+import type { Context, Next } from "hono";
+import { contextStorage, getContext } from "hono/context-storage";
+import {
+	RequestTimings,
+	type TimingSummary,
+	setTimingsSource,
+	trackTimedRequest,
+} from "../timing";
+
+export interface TimingLogEntry extends TimingSummary {
+	type: "server_timing";
+	method: string;
+	path: string;
+	status: number;
+}
+
+function currentTimings(): RequestTimings | undefined {
+	try {
+		return getContext<{ Variables: { timings?: RequestTimings } }>().get(
+			"timings",
+		);
+	} catch {
+		// Outside a timed request, e.g. the scheduled handler
+		return undefined;
+	}
+}
+
+function round(ms: number) {
+	return Math.round(ms * 100) / 100;
+}
+
+export function formatServerTiming(summary: TimingSummary): string {
+	return [
+		`db;dur=${round(summary.db)};desc="${summary.dbCalls} queries"`,
+		`crypto;dur=${round(summary.crypto)};desc="${summary.cryptoCalls} ops"`,
+		`handler;dur=${round(summary.handler)}`,
+		`total;dur=${round(summary.total)}`,
+	].join(", ");
+}
+
+export function isServerTimingEnabled(value: string | undefined): boolean {
+	return value === "1" || value === "true";
+}
+
+export interface ServerTimingOptions {
+	enabled?: (c: Context) => boolean;
+	log?: (entry: TimingLogEntry) => void;
+}
+
+/**
+ * Splits each request's wall time into DB, crypto and remaining handler time,
+ * reporting it in a Server-Timing header and one structured log line. Off
+ * unless SERVER_TIMING is "1" or "true". Workers only advance timers across
+ * I/O, so CPU-bound phases read low in production; the local load harness
+ * runs under Node with a real clock.
+ */
+export function serverTiming(options: ServerTimingOptions = {}) {
+	const enabled =
+		options.enabled ??
+		((c: Context) => isServerTimingEnabled(c.env?.SERVER_TIMING));
+	const log =
+		options.log ?? ((entry: TimingLogEntry) => console.log(JSON.stringify(entry)));
+	const storage = contextStorage();
+	setTimingsSource(currentTimings);
+
+	return async (c: Context, next: Next) => {
+		if (!enabled(c)) {
+			await next();
+			return;
+		}
+
+		const timings = new RequestTimings();
+		c.set("timings", timings);
+		await trackTimedRequest(() => storage(c, next));
+
+		const summary = timings.summary();
+		c.res.headers.append("Server-Timing", formatServerTiming(summary));
+		log({
+			type: "server_timing",
+			method: c.req.method,
+			path: c.req.path,
+			status: c.res.status,
+			...summary,
+			total: round(summary.total),
+			db: round(summary.db),
+			crypto: round(summary.crypto),
+			handler: round(summary.handler),
+		});
+	};
+}
@@ -3,7 +3,8 @@ import { Hono } from "hono";
 import { generateApiKey, hashApiKey } from "../auth/crypto";
 import type { Database } from "../db/client";
 import { apiKeys } from "../db/schema";
-import { getClientIp, writeAuditLog } from "../middleware/audit";
+import { getApiKeyCache } from "../middleware/api-key-cache";
+import { getClientIp, recordAuditLog } from "../middleware/audit";
 
 type Bindings = {
 	TURSO_DATABASE_URL: string;
@@ -40,8 +41,9 @@ apiKeysApp.post("/", async (c) => {
 	});
 
 	const id = Number(result.lastInsertRowid);
+	getApiKeyCache(db).forget(keyHash);
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "api_key_created",
 		userId: user.sub,
 		ipAddress: getClientIp(c),
@@ -63,6 +65,7 @@ apiKeysApp.get("/", async (c) => {
 			keyPrefix: apiKeys.keyPrefix,
 			createdAt: apiKeys.createdAt,
 			revokedAt: apiKeys.revokedAt,
+			lastUsedAt: apiKeys.lastUsedAt,
 		})
 		.from(apiKeys)
 		.where(eq(apiKeys.userId, userId))
@@ -78,7 +81,7 @@ apiKeysApp.delete("/:keyId", async (c) => {
 	const userId = Number(user.sub);
 
 	const existing = await db
-		.select()
+		.select({ keyHash: apiKeys.keyHash, keyPrefix: apiKeys.keyPrefix })
 		.from(apiKeys)
 		.where(and(eq(apiKeys.id, keyId), eq(apiKeys.userId, userId)))
 		.get();
@@ -91,8 +94,9 @@ apiKeysApp.delete("/:keyId", async (c) => {
 		.update(apiKeys)
 		.set({ revokedAt: new Date().toISOString() })
 		.where(eq(apiKeys.id, keyId));
+	getApiKeyCache(db).revoke(existing.keyHash);
 
-	await writeAuditLog(db, {
+	await recordAuditLog(c, {
 		eventType: "api_key_revoked",
 		userId: user.sub,
 		ipAddress: getClientIp(c),
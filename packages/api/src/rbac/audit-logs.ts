@@ -1,4 +1,4 @@
-import { desc, eq, sql } from "drizzle-orm";
+import { type SQL, and, asc, desc, eq, gte, lt, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { auditLogs } from "../db/schema";
@@ -12,41 +12,215 @@ type Variables = {
 	db: Database;
 };
 
+export interface AuditLogCursor {
+	timestamp: string;
+	id: number;
+}
+
+// Cursors are opaque to clients: base64url-encoded "timestamp,id" pairs
+export function encodeCursor(cursor: AuditLogCursor): string {
+	return btoa(`${cursor.timestamp},${cursor.id}`)
+		.replace(/\+/g, "-")
+		.replace(/\//g, "_")
+		.replace(/=+$/, "");
+}
+
+export function decodeCursor(value: string): AuditLogCursor | null {
+	try {
+		const decoded = atob(value.replace(/-/g, "+").replace(/_/g, "/"));
+		const separator = decoded.lastIndexOf(",");
+		if (separator === -1) return null;
+		const timestamp = decoded.slice(0, separator);
+		const id = Number(decoded.slice(separator + 1));
+		if (!timestamp || !Number.isInteger(id)) return null;
+		return { timestamp, id };
+	} catch {
+		return null;
+	}
+}
+
+/**
+ * Rows strictly past the cursor in the given walk order. The row-value form
+ * lets SQLite seek the (…, timestamp, id) indexes straight to the cursor; the
+ * equivalent `timestamp < ? OR (timestamp = ? AND id < ?)` scans every row
+ * before it, making deep pages as expensive as OFFSET.
+ */
+export function pastCursor(
+	cursor: AuditLogCursor,
+	direction: "asc" | "desc",
+): SQL {
+	return direction === "desc"
+		? sql`(${auditLogs.timestamp}, ${auditLogs.id}) < (${cursor.timestamp}, ${cursor.id})`
+		: sql`(${auditLogs.timestamp}, ${auditLogs.id}) > (${cursor.timestamp}, ${cursor.id})`;
+}
+
+function parseTimestamp(value: string | undefined): string | null | undefined {
+	if (!value) return undefined;
+	const date = new Date(value);
+	if (Number.isNaN(date.getTime())) return null;
+	return date.toISOString();
+}
+
+type AuditLogFilters = { condition: SQL | undefined } | { error: string };
+
+function parseFilters(query: (name: string) => string | undefined): AuditLogFilters {
+	const eventType = query("event_type");
+	const userId = query("user_id");
+	const from = parseTimestamp(query("from"));
+	const to = parseTimestamp(query("to"));
+
+	if (from === null || to === null) {
+		return { error: "Invalid time range" };
+	}
+
+	// Filters are ordered to line up with the (event_type|user_id, timestamp, id) indexes
+	const filters: (SQL | undefined)[] = [
+		eventType ? eq(auditLogs.eventType, eventType) : undefined,
+		userId ? eq(auditLogs.userId, userId) : undefined,
+		from ? gte(auditLogs.timestamp, from) : undefined,
+		to ? lt(auditLogs.timestamp, to) : undefined,
+	];
+	return { condition: and(...filters) };
+}
+
+const EXPORT_CHUNK_SIZE = 500;
+
+/**
+ * Streams matching rows as NDJSON, oldest first. Each pull reads one keyset
+ * chunk, so memory stays constant however large the range is.
+ */
+export function exportAuditLogs(
+	db: Database,
+	condition: SQL | undefined,
+	chunkSize = EXPORT_CHUNK_SIZE,
+): ReadableStream<Uint8Array> {
+	const encoder = new TextEncoder();
+	let cursor: AuditLogCursor | undefined;
+
+	return new ReadableStream<Uint8Array>({
+		async pull(controller) {
+			const after = cursor ? pastCursor(cursor, "asc") : undefined;
+
+			const rows = await db
+				.select()
+				.from(auditLogs)
+				.where(and(condition, after))
+				.orderBy(asc(auditLogs.timestamp), asc(auditLogs.id))
+				.limit(chunkSize)
+				.all();
+
+			if (rows.length > 0) {
+				const lines = rows.map((row) => `${JSON.stringify(row)}\n`).join("");
+				controller.enqueue(encoder.encode(lines));
+				const last = rows[rows.length - 1];
+				cursor = { timestamp: last.timestamp, id: last.id };
+			}
+			if (rows.length < chunkSize) {
+				controller.close();
+			}
+		},
+	});
+}
+
 const auditLogsApp = new Hono<{ Bindings: Bindings; Variables: Variables }>();
 
+auditLogsApp.get("/export", async (c) => {
+	const db = c.get("db");
+
+	const filters = parseFilters((name) => c.req.query(name));
+	if ("error" in filters) {
+		return c.json({ error: filters.error }, 400);
+	}
+
+	const stream = exportAuditLogs(db, filters.condition);
+
+	if (c.req.query("compress") === "gzip") {
+		return c.body(stream.pipeThrough(new CompressionStream("gzip")), 200, {
+			"Content-Type": "application/gzip",
+			"Content-Disposition": 'attachment; filename="audit-logs.ndjson.gz"',
+		});
+	}
+
+	return c.body(stream, 200, {
+		"Content-Type": "application/x-ndjson",
+		"Content-Disposition": 'attachment; filename="audit-logs.ndjson"',
+	});
+});
+
 auditLogsApp.get("/", async (c) => {
 	const db = c.get("db");
 
-	const page = Math.max(1, Number(c.req.query("page")) || 1);
 	const limit = Math.max(1, Math.min(100, Number(c.req.query("limit")) || 20));
-	const eventType = c.req.query("event_type");
-	const offset = (page - 1) * limit;
+	const cursorParam = c.req.query("cursor");
+	const pageParam = c.req.query("page");
 
-	const condition = eventType
-		? eq(auditLogs.eventType, eventType)
-		: undefined;
+	const filters = parseFilters((name) => c.req.query(name));
+	if ("error" in filters) {
+		return c.json({ error: filters.error }, 400);
+	}
+	const { condition } = filters;
 
-	const [countResult] = await db
-		.select({ count: sql<number>`count(*)` })
-		.from(auditLogs)
-		.where(condition)
-		.all();
+	const cursor = cursorParam ? decodeCursor(cursorParam) : undefined;
+	if (cursor === null) {
+		return c.json({ error: "Invalid cursor" }, 400);
+	}
+
+	// Legacy offset paging, kept for existing clients; always counts
+	if (pageParam !== undefined && !cursorParam) {
+		const page = Math.max(1, Number(pageParam) || 1);
+		const [countResult] = await db
+			.select({ count: sql<number>`count(*)` })
+			.from(auditLogs)
+			.where(condition)
+			.all();
+
+		const data = await db
+			.select()
+			.from(auditLogs)
+			.where(condition)
+			.orderBy(desc(auditLogs.timestamp), desc(auditLogs.id))
+			.limit(limit)
+			.offset((page - 1) * limit)
+			.all();
+
+		return c.json({
+			data,
+			pagination: { page, limit, total: Number(countResult.count) },
+		});
+	}
 
-	const total = Number(countResult.count);
+	const keyset = cursor ? pastCursor(cursor, "desc") : undefined;
 
-	const data = await db
+	// Fetch one extra row to learn whether another page exists
+	const rows = await db
 		.select()
 		.from(auditLogs)
-		.where(condition)
-		.orderBy(desc(auditLogs.timestamp))
-		.limit(limit)
-		.offset(offset)
+		.where(and(condition, keyset))
+		.orderBy(desc(auditLogs.timestamp), desc(auditLogs.id))
+		.limit(limit + 1)
 		.all();
 
-	return c.json({
-		data,
-		pagination: { page, limit, total },
-	});
+	const data = rows.slice(0, limit);
+	const last = data[data.length - 1];
+	const nextCursor =
+		rows.length > limit && last
+			? encodeCursor({ timestamp: last.timestamp, id: last.id })
+			: null;
+
+	const pagination: { limit: number; next_cursor: string | null; total?: number } =
+		{ limit, next_cursor: nextCursor };
+
+	const includeTotal = c.req.query("include_total");
+	if (includeTotal === "true" || includeTotal === "1") {
+		const [countResult] = await db
+			.select({ count: sql<number>`count(*)` })
+			.from(auditLogs)
+			.where(condition)
+			.all();
+		pagination.total = Number(countResult.count);
+	}
+
+	return c.json({ data, pagination });
 });
 
 export default auditLogsApp;
@@ -0,0 +1,103 @@
+import { type SQL, and, asc, lt, sql } from "drizzle-orm";
+import type { Database } from "../db/client";
+import { auditLogs } from "../db/schema";
+import type { AuditLogCursor } from "./audit-logs";
+
+export interface ArchiveStore {
+	put(key: string, body: Uint8Array): Promise<void>;
+}
+
+export class R2ArchiveStore implements ArchiveStore {
+	constructor(private bucket: R2Bucket) {}
+
+	async put(key: string, body: Uint8Array): Promise<void> {
+		await this.bucket.put(key, body, {
+			httpMetadata: { contentType: "application/gzip" },
+		});
+	}
+}
+
+export interface AuditRetentionOptions {
+	retentionDays?: number;
+	batchSize?: number;
+	maxBatches?: number;
+	timeBudgetMs?: number;
+	now?: Date;
+}
+
+export interface AuditRetentionResult {
+	archived: number;
+	archives: string[];
+}
+
+export async function gzip(text: string): Promise<Uint8Array> {
+	const stream = new Blob([text])
+		.stream()
+		.pipeThrough(new CompressionStream("gzip"));
+	return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Rows at or before `row` in (timestamp, id) order. Combined with the cutoff
+ * it matches exactly the batch just read, and seeks the same index.
+ */
+export function throughRow(row: AuditLogCursor): SQL {
+	return sql`(${auditLogs.timestamp}, ${auditLogs.id}) <= (${row.timestamp}, ${row.id})`;
+}
+
+/**
+ * Moves audit rows older than the retention window into gzip-compressed
+ * NDJSON archive blobs, oldest first, deleting each batch only after its
+ * archive is stored. Runs until the backlog is clear, `maxBatches` is reached
+ * or `timeBudgetMs` has elapsed. Archive keys derive from the batch's id
+ * range, so a run interrupted between put and delete rewrites the same blob
+ * next time.
+ */
+export async function archiveAuditLogs(
+	db: Database,
+	store: ArchiveStore,
+	options: AuditRetentionOptions = {},
+): Promise<AuditRetentionResult> {
+	const retentionDays = options.retentionDays ?? 90;
+	const batchSize = options.batchSize ?? 1000;
+	const maxBatches = options.maxBatches ?? 100;
+	const timeBudgetMs = options.timeBudgetMs ?? 25_000;
+	const now = options.now ?? new Date();
+	const cutoff = new Date(
+		now.getTime() - retentionDays * 24 * 60 * 60 * 1000,
+	).toISOString();
+	const deadline = Date.now() + timeBudgetMs;
+
+	const result: AuditRetentionResult = { archived: 0, archives: [] };
+
+	for (let i = 0; i < maxBatches && Date.now() < deadline; i++) {
+		const rows = await db
+			.select()
+			.from(auditLogs)
+			.where(lt(auditLogs.timestamp, cutoff))
+			.orderBy(asc(auditLogs.timestamp), asc(auditLogs.id))
+			.limit(batchSize)
+			.all();
+
+		if (rows.length === 0) break;
+
+		const first = rows[0];
+		const last = rows[rows.length - 1];
+		const key = `audit-logs/${first.timestamp.slice(0, 10)}/${first.id}-${last.id}.ndjson.gz`;
+		const body = await gzip(
+			rows.map((row) => `${JSON.stringify(row)}\n`).join(""),
+		);
+		await store.put(key, body);
+
+		await db
+			.delete(auditLogs)
+			.where(and(lt(auditLogs.timestamp, cutoff), throughRow(last)));
+
+		result.archived += rows.length;
+		result.archives.push(key);
+
+		if (rows.length < batchSize) break;
+	}
+
+	return result;
+}
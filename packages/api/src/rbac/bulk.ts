@@ -0,0 +1,56 @@
+import type { BatchItem } from "drizzle-orm/batch";
+import type { Database } from "../db/client";
+
+// Keeps one request's batch well under libsql's statement and variable limits
+export const MAX_BULK_ITEMS = 1000;
+
+export interface BulkChanges<T> {
+	assign: T[];
+	revoke: T[];
+}
+
+export function isId(value: unknown): value is number {
+	return Number.isInteger(value) && (value as number) > 0;
+}
+
+export function parseBulkChanges<T>(
+	body: { assign?: unknown; revoke?: unknown } | null,
+	isItem: (item: unknown) => item is T,
+): BulkChanges<T> | { error: string } {
+	const assign = body?.assign ?? [];
+	const revoke = body?.revoke ?? [];
+
+	if (!Array.isArray(assign) || !Array.isArray(revoke)) {
+		return { error: "assign and revoke must be arrays" };
+	}
+	if (assign.length === 0 && revoke.length === 0) {
+		return { error: "assign or revoke is required" };
+	}
+	if (assign.length + revoke.length > MAX_BULK_ITEMS) {
+		return { error: `At most ${MAX_BULK_ITEMS} changes per request` };
+	}
+	if (!assign.every(isItem) || !revoke.every(isItem)) {
+		return { error: "Invalid change entry" };
+	}
+	return { assign, revoke };
+}
+
+/**
+ * Runs the statements in one db.batch round-trip (a single transaction) and
+ * returns the rows affected by each.
+ */
+export async function runBatch(
+	db: Database,
+	statements: BatchItem<"sqlite">[],
+): Promise<number[]> {
+	const [first, ...rest] = statements;
+	if (!first) return [];
+	const results = await db.batch([first, ...rest]);
+	return results.map(
+		(result) => (result as { rowsAffected?: number }).rowsAffected ?? 0,
+	);
+}
+
+export function sum(values: number[]): number {
+	return values.reduce((total, value) => total + value, 0);
+}
@@ -0,0 +1,17 @@
+import { mkdir, writeFile } from "node:fs/promises";
+import { dirname, join } from "node:path";
+import type { ArchiveStore } from "./audit-retention";
+
+/**
+ * Local filesystem stand-in for the R2 archive bucket, for tests and local
+ * runs. Not imported by the Worker entrypoint, which has no filesystem.
+ */
+export class FileSystemArchiveStore implements ArchiveStore {
+	constructor(private rootDir: string) {}
+
+	async put(key: string, body: Uint8Array): Promise<void> {
+		const path = join(this.rootDir, key);
+		await mkdir(dirname(path), { recursive: true });
+		await writeFile(path, body);
+	}
+}
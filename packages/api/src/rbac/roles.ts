@@ -1,11 +1,14 @@
-import { and, eq } from "drizzle-orm";
+import { and, eq, inArray, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import { permissions, rolePermissions, roles, userRoles } from "../db/schema";
+import { invalidatePermissions } from "../middleware/permission-cache";
+import { isId, parseBulkChanges, runBatch, sum } from "./bulk";
 
 type Bindings = {
 	TURSO_DATABASE_URL: string;
 	TURSO_AUTH_TOKEN?: string;
+	PERMISSIONS_KV?: KVNamespace;
 };
 
 type Variables = {
@@ -17,25 +20,25 @@ const rolesApp = new Hono<{ Bindings: Bindings; Variables: Variables }>();
 rolesApp.get("/", async (c) => {
 	const db = c.get("db");
 
-	const allRoles = await db.select().from(roles).all();
-
-	const result = await Promise.all(
-		allRoles.map(async (role) => {
-			const perms = await db
-				.select({ permission: permissions.permission })
-				.from(rolePermissions)
-				.innerJoin(permissions, eq(rolePermissions.permissionId, permissions.id))
-				.where(eq(rolePermissions.roleId, role.id))
-				.all();
-
-			return {
-				id: role.id,
-				name: role.name,
-				description: role.description,
-				permissions: perms.map((p) => p.permission),
-			};
-		}),
-	);
+	// One grouped query instead of a permissions lookup per role
+	const rows = await db
+		.select({
+			id: roles.id,
+			name: roles.name,
+			description: roles.description,
+			permissions: sql<string>`json_group_array(${permissions.permission}) filter (where ${permissions.permission} is not null)`,
+		})
+		.from(roles)
+		.leftJoin(rolePermissions, eq(rolePermissions.roleId, roles.id))
+		.leftJoin(permissions, eq(rolePermissions.permissionId, permissions.id))
+		.groupBy(roles.id)
+		.orderBy(roles.id)
+		.all();
+
+	const result = rows.map((row) => ({
+		...row,
+		permissions: JSON.parse(row.permissions) as string[],
+	}));
 
 	return c.json(result, 200);
 });
@@ -72,6 +75,94 @@ rolesApp.post("/", async (c) => {
 	}
 });
 
+type RolePermissionChange = { roleId: number; permission: string };
+
+function isRolePermissionChange(item: unknown): item is RolePermissionChange {
+	const change = item as Partial<RolePermissionChange> | null;
+	return (
+		isId(change?.roleId) &&
+		typeof change?.permission === "string" &&
+		change.permission.length > 0
+	);
+}
+
+rolesApp.post("/permissions/bulk", async (c) => {
+	const body = await c.req.json<{ assign?: unknown; revoke?: unknown }>();
+	const changes = parseBulkChanges(body, isRolePermissionChange);
+	if ("error" in changes) {
+		return c.json({ error: changes.error }, 400);
+	}
+
+	const db = c.get("db");
+
+	const roleIds = [
+		...new Set([...changes.assign, ...changes.revoke].map((ch) => ch.roleId)),
+	];
+	const found = await db
+		.select({ id: roles.id })
+		.from(roles)
+		.where(inArray(roles.id, roleIds))
+		.all();
+	const foundIds = new Set(found.map((r) => r.id));
+	const missing = roleIds.filter((id) => !foundIds.has(id));
+	if (missing.length > 0) {
+		return c.json({ error: "Role not found", roleIds: missing }, 404);
+	}
+
+	const now = new Date().toISOString();
+	const names = [...new Set(changes.assign.map((ch) => ch.permission))];
+
+	// Statements run in order inside one transaction, so each link sees the
+	// permission rows and earlier links created before it
+	const results = await runBatch(db, [
+		...(names.length > 0
+			? [
+					db
+						.insert(permissions)
+						.values(names.map((permission) => ({ permission })))
+						.onConflictDoNothing(),
+				]
+			: []),
+		...changes.assign.map(({ roleId, permission }) =>
+			db.run(sql`
+				INSERT INTO role_permissions (role_id, permission_id, created_at)
+				SELECT ${roleId}, id, ${now}
+				FROM permissions
+				WHERE permission = ${permission}
+					AND NOT EXISTS (
+						SELECT 1 FROM role_permissions
+						WHERE role_id = ${roleId} AND permission_id = permissions.id
+					)
+			`),
+		),
+		...changes.revoke.map(({ roleId, permission }) =>
+			db
+				.delete(rolePermissions)
+				.where(
+					and(
+						eq(rolePermissions.roleId, roleId),
+						inArray(
+							rolePermissions.permissionId,
+							db
+								.select({ id: permissions.id })
+								.from(permissions)
+								.where(eq(permissions.permission, permission)),
+						),
+					),
+				),
+		),
+	]);
+
+	const linkResults = results.slice(names.length > 0 ? 1 : 0);
+	const assigned = sum(linkResults.slice(0, changes.assign.length));
+	const revoked = sum(linkResults.slice(changes.assign.length));
+	if (assigned > 0 || revoked > 0) {
+		await invalidatePermissions(c);
+	}
+
+	return c.json({ assigned, revoked }, 200);
+});
+
 rolesApp.post("/:roleId/permissions", async (c) => {
 	const roleId = Number(c.req.param("roleId"));
 	const body = await c.req.json<{ permission?: string }>();
@@ -124,6 +215,7 @@ rolesApp.post("/:roleId/permissions", async (c) => {
 			roleId,
 			permissionId: permissionRow.id,
 		});
+		await invalidatePermissions(c);
 	}
 
 	return c.json({ roleId, permission: body.permission }, 200);
@@ -170,6 +262,7 @@ rolesApp.delete("/:roleId", async (c) => {
 
 	await db.delete(rolePermissions).where(eq(rolePermissions.roleId, roleId));
 	await db.delete(roles).where(eq(roles.id, roleId));
+	await invalidatePermissions(c);
 
 	return c.json({ message: "Role deleted" }, 200);
 });
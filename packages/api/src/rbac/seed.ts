@@ -1,12 +1,14 @@
-import { eq } from "drizzle-orm";
+import { eq, inArray, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
-import { permissions, rolePermissions, roles, userRoles } from "../db/schema";
+import { permissions, roles } from "../db/schema";
+import { invalidatePermissions } from "../middleware/permission-cache";
 
 type Bindings = {
 	TURSO_DATABASE_URL: string;
 	TURSO_AUTH_TOKEN?: string;
 	ADMIN_SETUP_TOKEN?: string;
+	PERMISSIONS_KV?: KVNamespace;
 };
 
 type Variables = {
@@ -41,25 +43,35 @@ seedApp.post("/", async (c) => {
 		return c.json({ error: "Admin role already exists" }, 409);
 	}
 
-	const roleResult = await db.insert(roles).values({
-		name: "admin",
-		description: "Administrator with full access",
-	});
-	const roleId = Number(roleResult.lastInsertRowid);
-
 	const permissionNames = ["manage_roles", "manage_users"];
-	const permissionIds: number[] = [];
-
-	for (const perm of permissionNames) {
-		const result = await db.insert(permissions).values({ permission: perm });
-		permissionIds.push(Number(result.lastInsertRowid));
-	}
-
-	for (const permissionId of permissionIds) {
-		await db.insert(rolePermissions).values({ roleId, permissionId });
-	}
-
-	await db.insert(userRoles).values({ userId: body.userId, roleId });
+	const now = new Date().toISOString();
+
+	// Role, permissions and links go out as one batch; the link inserts look
+	// up the ids the earlier statements created
+	await db.batch([
+		db.insert(roles).values({
+			name: "admin",
+			description: "Administrator with full access",
+		}),
+		db
+			.insert(permissions)
+			.values(permissionNames.map((permission) => ({ permission })))
+			.onConflictDoNothing(),
+		db.run(sql`
+			INSERT INTO role_permissions (role_id, permission_id, created_at)
+			SELECT ${roles.id}, ${permissions.id}, ${now}
+			FROM ${roles}, ${permissions}
+			WHERE ${roles.name} = 'admin'
+				AND ${inArray(permissions.permission, permissionNames)}
+		`),
+		db.run(sql`
+			INSERT INTO user_roles (user_id, role_id, created_at)
+			SELECT ${body.userId}, ${roles.id}, ${now}
+			FROM ${roles}
+			WHERE ${roles.name} = 'admin'
+		`),
+	]);
+	await invalidatePermissions(c);
 
 	return c.json(
 		{
@@ -1,4 +1,4 @@
-import { and, eq } from "drizzle-orm";
+import { and, eq, inArray, sql } from "drizzle-orm";
 import { Hono } from "hono";
 import type { Database } from "../db/client";
 import {
@@ -8,10 +8,13 @@ import {
 	userRoles,
 	users,
 } from "../db/schema";
+import { invalidatePermissions } from "../middleware/permission-cache";
+import { isId, parseBulkChanges, runBatch, sum } from "./bulk";
 
 type Bindings = {
 	TURSO_DATABASE_URL: string;
 	TURSO_AUTH_TOKEN?: string;
+	PERMISSIONS_KV?: KVNamespace;
 };
 
 type Variables = {
@@ -55,10 +58,14 @@ userRolesApp.post("/:userId/roles", async (c) => {
 		return c.json({ error: "Role not found" }, 404);
 	}
 
-	await db.insert(userRoles).values({
-		userId,
-		roleId: body.roleId,
-	});
+	await db
+		.insert(userRoles)
+		.values({
+			userId,
+			roleId: body.roleId,
+		})
+		.onConflictDoNothing();
+	await invalidatePermissions(c);
 
 	return c.json({ userId, roleId: body.roleId }, 200);
 });
@@ -67,29 +74,108 @@ userRolesApp.get("/:userId/permissions", async (c) => {
 	const userId = Number(c.req.param("userId"));
 	const db = c.get("db");
 
-	const user = await db.select().from(users).where(eq(users.id, userId)).get();
-	if (!user) {
+	// One round-trip: the user check and both aggregates come back together
+	const row = await db
+		.select({
+			roles: sql<string>`(
+				select json_group_array(json_object('id', ${roles.id}, 'name', ${roles.name}))
+				from ${userRoles}
+				inner join ${roles} on ${roles.id} = ${userRoles.roleId}
+				where ${userRoles.userId} = ${users.id}
+			)`,
+			permissions: sql<string>`(
+				select json_group_array(distinct ${permissions.permission})
+				from ${userRoles}
+				inner join ${rolePermissions} on ${rolePermissions.roleId} = ${userRoles.roleId}
+				inner join ${permissions} on ${permissions.id} = ${rolePermissions.permissionId}
+				where ${userRoles.userId} = ${users.id}
+			)`,
+		})
+		.from(users)
+		.where(eq(users.id, userId))
+		.get();
+
+	if (!row) {
 		return c.json({ error: "User not found" }, 404);
 	}
 
-	const rows = await db
-		.select({ permission: permissions.permission })
-		.from(userRoles)
-		.innerJoin(rolePermissions, eq(userRoles.roleId, rolePermissions.roleId))
-		.innerJoin(permissions, eq(rolePermissions.permissionId, permissions.id))
-		.where(eq(userRoles.userId, userId))
-		.all();
+	return c.json(
+		{
+			permissions: JSON.parse(row.permissions) as string[],
+			roles: JSON.parse(row.roles) as { id: number; name: string }[],
+		},
+		200,
+	);
+});
 
-	const uniquePermissions = [...new Set(rows.map((r) => r.permission))];
+type UserRoleChange = { userId: number; roleId: number };
 
-	const assignedRoles = await db
-		.select({ id: roles.id, name: roles.name })
-		.from(userRoles)
-		.innerJoin(roles, eq(userRoles.roleId, roles.id))
-		.where(eq(userRoles.userId, userId))
+function isUserRoleChange(item: unknown): item is UserRoleChange {
+	const change = item as Partial<UserRoleChange> | null;
+	return isId(change?.userId) && isId(change?.roleId);
+}
+
+userRolesApp.post("/roles/bulk", async (c) => {
+	const body = await c.req.json<{ assign?: unknown; revoke?: unknown }>();
+	const changes = parseBulkChanges(body, isUserRoleChange);
+	if ("error" in changes) {
+		return c.json({ error: changes.error }, 400);
+	}
+
+	const db = c.get("db");
+	const all = [...changes.assign, ...changes.revoke];
+
+	const userIds = [...new Set(all.map((ch) => ch.userId))];
+	const foundUsers = await db
+		.select({ id: users.id })
+		.from(users)
+		.where(inArray(users.id, userIds))
 		.all();
+	const foundUserIds = new Set(foundUsers.map((u) => u.id));
+	const missingUsers = userIds.filter((id) => !foundUserIds.has(id));
+	if (missingUsers.length > 0) {
+		return c.json({ error: "User not found", userIds: missingUsers }, 404);
+	}
+
+	const roleIds = [...new Set(all.map((ch) => ch.roleId))];
+	const foundRoles = await db
+		.select({ id: roles.id })
+		.from(roles)
+		.where(inArray(roles.id, roleIds))
+		.all();
+	const foundRoleIds = new Set(foundRoles.map((r) => r.id));
+	const missingRoles = roleIds.filter((id) => !foundRoleIds.has(id));
+	if (missingRoles.length > 0) {
+		return c.json({ error: "Role not found", roleIds: missingRoles }, 404);
+	}
+
+	const now = new Date().toISOString();
+	const results = await runBatch(db, [
+		// NOT EXISTS keeps assignment idempotent, including repeats in one request
+		...changes.assign.map(({ userId, roleId }) =>
+			db.run(sql`
+				INSERT INTO user_roles (user_id, role_id, created_at)
+				SELECT ${userId}, ${roleId}, ${now}
+				WHERE NOT EXISTS (
+					SELECT 1 FROM user_roles
+					WHERE user_id = ${userId} AND role_id = ${roleId}
+				)
+			`),
+		),
+		...changes.revoke.map(({ userId, roleId }) =>
+			db
+				.delete(userRoles)
+				.where(and(eq(userRoles.userId, userId), eq(userRoles.roleId, roleId))),
+		),
+	]);
+
+	const assigned = sum(results.slice(0, changes.assign.length));
+	const revoked = sum(results.slice(changes.assign.length));
+	if (assigned > 0 || revoked > 0) {
+		await invalidatePermissions(c);
+	}
 
-	return c.json({ permissions: uniquePermissions, roles: assignedRoles }, 200);
+	return c.json({ assigned, revoked }, 200);
 });
 
 userRolesApp.delete("/:userId/roles/:roleId", async (c) => {
@@ -114,6 +200,7 @@ userRolesApp.delete("/:userId/roles/:roleId", async (c) => {
 	await db
 		.delete(userRoles)
 		.where(and(eq(userRoles.userId, userId), eq(userRoles.roleId, roleId)));
+	await invalidatePermissions(c);
 
 	return c.json({ message: "Role unassigned" }, 200);
 });
@@ -0,0 +1,75 @@
+export type TimingPhase = "db" | "crypto";
+
+export interface TimingSummary {
+	total: number;
+	db: number;
+	crypto: number;
+	handler: number;
+	dbCalls: number;
+	cryptoCalls: number;
+}
+
+export class RequestTimings {
+	private startedAt = performance.now();
+	private durations = { db: 0, crypto: 0 };
+	private calls = { db: 0, crypto: 0 };
+
+	add(phase: TimingPhase, durationMs: number) {
+		this.durations[phase] += durationMs;
+		this.calls[phase] += 1;
+	}
+
+	summary(): TimingSummary {
+		const total = performance.now() - this.startedAt;
+		const { db, crypto } = this.durations;
+		return {
+			total,
+			db,
+			crypto,
+			// Phases overlap when a handler awaits several at once; clamp at zero
+			handler: Math.max(0, total - db - crypto),
+			dbCalls: this.calls.db,
+			cryptoCalls: this.calls.crypto,
+		};
+	}
+}
+
+// Requests currently being timed, so timed() skips the lookup otherwise
+let timedRequests = 0;
+let currentTimings: () => RequestTimings | undefined = () => undefined;
+
+/**
+ * Registers how to find the current request's timings. The request layer
+ * (the serverTiming middleware) owns request context, so this module stays
+ * free of framework imports.
+ */
+export function setTimingsSource(source: () => RequestTimings | undefined) {
+	currentTimings = source;
+}
+
+/** Marks a request as timed for the duration of `run`. */
+export async function trackTimedRequest<T>(run: () => Promise<T>): Promise<T> {
+	timedRequests += 1;
+	try {
+		return await run();
+	} finally {
+		timedRequests -= 1;
+	}
+}
+
+/** Runs `run`, charging its duration to `phase` of the current timed request. */
+export async function timed<T>(
+	phase: TimingPhase,
+	run: () => Promise<T>,
+): Promise<T> {
+	const timings = timedRequests > 0 ? currentTimings() : undefined;
+	if (!timings) {
+		return run();
+	}
+	const start = performance.now();
+	try {
+		return await run();
+	} finally {
+		timings.add(phase, performance.now() - start);
+	}
+}
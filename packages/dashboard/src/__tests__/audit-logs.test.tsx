@@ -49,22 +49,22 @@ const mockEntries = [
 
 function setupState(overrides: {
 	entries?: any[];
-	pagination?: { page: number; limit: number; total: number };
+	nextCursor?: string | null;
 	loading?: boolean;
 	error?: string | null;
-	page?: number;
+	cursors?: (string | null)[];
 	eventType?: string;
 } = {}) {
 	useStateCallIndex = 0;
 	stateValues.length = 0;
 	// useState call order in AuditLogsPage:
-	// 0: entries, 1: pagination, 2: loading, 3: error, 4: page, 5: eventType
+	// 0: entries, 1: nextCursor, 2: loading, 3: error, 4: cursors, 5: eventType
 	stateValues.push(
 		overrides.entries ?? [],
-		overrides.pagination ?? { page: 1, limit: 20, total: 0 },
+		overrides.nextCursor ?? null,
 		overrides.loading ?? false,
 		overrides.error ?? null,
-		overrides.page ?? 1,
+		overrides.cursors ?? [null],
 		overrides.eventType ?? "",
 	);
 }
@@ -107,10 +107,7 @@ describe("AuditLogsPage", () => {
 	});
 
 	it("renders audit log entries in a table", () => {
-		setupState({
-			entries: mockEntries,
-			pagination: { page: 1, limit: 20, total: 2 },
-		});
+		setupState({ entries: mockEntries });
 		const tree = AuditLogsPage();
 		const rows = findAll(tree, (el) => el.type === "tr");
 		// 1 header row + 2 data rows
@@ -128,8 +125,8 @@ describe("AuditLogsPage", () => {
 	it("Previous button is disabled on page 1", () => {
 		setupState({
 			entries: mockEntries,
-			pagination: { page: 1, limit: 20, total: 40 },
-			page: 1,
+			nextCursor: "cursor-2",
+			cursors: [null],
 		});
 		const tree = AuditLogsPage();
 		const buttons = findAll(tree, (el) => el.type === "button");
@@ -143,8 +140,8 @@ describe("AuditLogsPage", () => {
 	it("Previous button is not disabled on page 2", () => {
 		setupState({
 			entries: mockEntries,
-			pagination: { page: 2, limit: 20, total: 40 },
-			page: 2,
+			nextCursor: "cursor-3",
+			cursors: [null, "cursor-2"],
 		});
 		const tree = AuditLogsPage();
 		const buttons = findAll(tree, (el) => el.type === "button");
@@ -155,11 +152,11 @@ describe("AuditLogsPage", () => {
 		expect(prevButton.props.disabled).toBe(false);
 	});
 
-	it("Next button is not disabled when more pages exist", () => {
+	it("Next button is not disabled when a next cursor exists", () => {
 		setupState({
 			entries: mockEntries,
-			pagination: { page: 1, limit: 20, total: 40 },
-			page: 1,
+			nextCursor: "cursor-2",
+			cursors: [null],
 		});
 		const tree = AuditLogsPage();
 		const buttons = findAll(tree, (el) => el.type === "button");
@@ -173,8 +170,8 @@ describe("AuditLogsPage", () => {
 	it("Next button is disabled on the last page", () => {
 		setupState({
 			entries: mockEntries,
-			pagination: { page: 2, limit: 20, total: 40 },
-			page: 2,
+			nextCursor: null,
+			cursors: [null, "cursor-2"],
 		});
 		const tree = AuditLogsPage();
 		const buttons = findAll(tree, (el) => el.type === "button");
@@ -188,19 +185,16 @@ describe("AuditLogsPage", () => {
 	it("displays page info", () => {
 		setupState({
 			entries: mockEntries,
-			pagination: { page: 1, limit: 20, total: 40 },
-			page: 1,
+			nextCursor: "cursor-3",
+			cursors: [null, "cursor-2"],
 		});
 		const tree = AuditLogsPage();
 		const text = getTextContent(tree);
-		expect(text).toContain("Page 1 of 2");
+		expect(text).toContain("Page 2");
 	});
 
 	it("renders event type filter dropdown with all options", () => {
-		setupState({
-			entries: mockEntries,
-			pagination: { page: 1, limit: 20, total: 2 },
-		});
+		setupState({ entries: mockEntries });
 		const tree = AuditLogsPage();
 		const selects = findAll(tree, (el) => el.type === "select");
 		expect(selects.length).toBe(1);
@@ -11,9 +11,8 @@ interface AuditLogEntry {
 }
 
 interface Pagination {
-	page: number;
 	limit: number;
-	total: number;
+	next_cursor: string | null;
 }
 
 interface AuditLogsResponse {
@@ -50,22 +49,27 @@ function formatMetadata(metadata: string | null): string {
 export function AuditLogsPage() {
 	const apiFetch = useApiFetch();
 	const [entries, setEntries] = useState<AuditLogEntry[]>([]);
-	const [pagination, setPagination] = useState<Pagination>({ page: 1, limit: 20, total: 0 });
+	const [nextCursor, setNextCursor] = useState<string | null>(null);
 	const [loading, setLoading] = useState(true);
 	const [error, setError] = useState<string | null>(null);
-	const [page, setPage] = useState(1);
+	// Cursors of the pages visited so far; the last one is the current page
+	const [cursors, setCursors] = useState<(string | null)[]>([null]);
 	const [eventType, setEventType] = useState("");
 
+	const page = cursors.length;
+	const cursor = cursors[cursors.length - 1];
+
 	async function fetchAuditLogs() {
 		setLoading(true);
 		try {
-			const params = new URLSearchParams({ page: String(page) });
+			const params = new URLSearchParams();
+			if (cursor) params.set("cursor", cursor);
 			if (eventType) params.set("event_type", eventType);
 			const res = await apiFetch(`/audit-logs?${params}`);
 			if (!res.ok) throw new Error(`Failed to fetch audit logs: ${res.status}`);
 			const json: AuditLogsResponse = await res.json();
 			setEntries(json.data);
-			setPagination(json.pagination);
+			setNextCursor(json.pagination.next_cursor);
 			setError(null);
 		} catch (err) {
 			setError(err instanceof Error ? err.message : "Failed to fetch audit logs");
@@ -76,9 +80,7 @@ export function AuditLogsPage() {
 
 	useEffect(() => {
 		fetchAuditLogs();
-	}, [page, eventType]);
-
-	const totalPages = Math.max(1, Math.ceil(pagination.total / pagination.limit));
+	}, [cursor, eventType]);
 
 	if (loading) return <p>Loading audit logs...</p>;
 
@@ -95,7 +97,7 @@ export function AuditLogsPage() {
 						value={eventType}
 						onChange={(e) => {
 							setEventType(e.target.value);
-							setPage(1);
+							setCursors([null]);
 						}}
 						className="border rounded px-2 py-1"
 					>
@@ -140,18 +142,18 @@ export function AuditLogsPage() {
 
 			<div className="flex items-center gap-4 mt-4">
 				<button
-					onClick={() => setPage((p) => Math.max(1, p - 1))}
+					onClick={() => setCursors((c) => (c.length > 1 ? c.slice(0, -1) : c))}
 					disabled={page <= 1}
 					className="bg-blue-600 text-white px-4 py-1 rounded hover:bg-blue-700 disabled:opacity-50"
 				>
 					Previous
 				</button>
-				<span className="text-sm text-gray-600">
-					Page {page} of {totalPages}
-				</span>
+				<span className="text-sm text-gray-600">Page {page}</span>
 				<button
-					onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-					disabled={page >= totalPages}
+					onClick={() => {
+						if (nextCursor) setCursors((c) => [...c, nextCursor]);
+					}}
+					disabled={!nextCursor}
 					className="bg-blue-600 text-white px-4 py-1 rounded hover:bg-blue-700 disabled:opacity-50"
 				>
 					Next